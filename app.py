@@ -1,87 +1,550 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, session, flash, send_file
+from flask import Flask, render_template, jsonify, request, redirect, url_for, session, flash, send_file, Response, stream_with_context, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import case, delete, event, func, insert, inspect, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+import sqlite3
+from datetime import datetime, timedelta
 from functools import wraps
 import json
+import logging
+import hashlib
+import hmac
+import threading
+import uuid
+import unicodedata
+import time
 import openai
+import click
 import os
 from io import BytesIO
 from flask_migrate import Migrate
-from langchain.llms import OpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 from dotenv import load_dotenv
-from transformers import pipeline, AutoTokenizer, AutoModelForQuestionAnswering
-from gtts import gTTS
+from model_registry import registry
+from metrics import metrics, stage_seconds, timed_stage, add_stage_listener
+from concurrency import CapacityExceeded, ConcurrencyLimiter
+from llm_provider import LLMProvider, FEEDBACK_PROMPT, FEEDBACK_PROMPT_VERSION, QUESTION_GENERATION_PROMPT
+from caching import CoalescingCache
+from feedback import FeedbackParser, parse_feedback, parse_feedback_html, FALLBACK_FEEDBACK, FEEDBACK_SECTIONS
+from qa_engine import QABatcher, TextEncoding
+from qa_runtime import load_qa_runtime, mmap_safetensor, parity_check
+from qa_server import QAInferenceServer, RemoteQABatcher
+from scoring import provisional_scores
+from jobs import BackgroundWorkerPool
+from transcription import create_transcription_backend, LocalWhisperBackend
+from audio_storage import AudioStore, audio_extension, audio_mimetype
+from tts_cache import TTSCache, create_synthesizer
+from streaming_transcription import TranscriptionStreamManager
 
 # Load environment variables
 load_dotenv()
 
+# Leveled logging; debug output (transcripts, contexts) is off unless LOG_LEVEL=DEBUG
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 # Initialize OpenAI
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-# Initialize LangChain
-llm = OpenAI(temperature=0.7)
-
-# Initialize QA pipeline
+# Heavy clients are built on first use (or via /healthz/warm) rather than at import,
+# so CLI commands and worker start-up don't pay the transformers/torch cost.
 model_path = os.path.join(os.path.dirname(__file__), "model")
-tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
-model = AutoModelForQuestionAnswering.from_pretrained(model_path, local_files_only=True)
-
-# Create pipeline with loaded model
-qa_pipeline = pipeline(
-    "question-answering",
-    model=model,
-    tokenizer=tokenizer,
-    device=-1  # Use CPU
+
+def load_qa_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+
+# 'torch' (full precision), 'quantized' (dynamic int8), 'onnx' or 'onnx-int8' (ONNX Runtime)
+QA_RUNTIME = os.getenv('QA_RUNTIME', 'torch')
+
+# Forward passes run on QA_MAX_CONCURRENCY executor threads, each pinned to a
+# share of the cores so concurrent batches don't oversubscribe the CPU
+QA_MAX_CONCURRENCY = int(os.getenv('QA_MAX_CONCURRENCY', 1))
+QA_THREADS = int(os.getenv('QA_THREADS') or max(1, (os.cpu_count() or 1) // QA_MAX_CONCURRENCY))
+
+def load_qa_pipeline(runtime=None):
+    # Runs on the CPU; exported ONNX graphs are kept under instance/qa_onnx
+    return load_qa_runtime(
+        model_path,
+        registry.get('qa_tokenizer'),
+        runtime=runtime or QA_RUNTIME,
+        cache_dir=os.getenv('QA_ONNX_DIR', os.path.join(os.path.dirname(__file__), 'instance', 'qa_onnx')),
+        revision=qa_model_revision(),
+        threads=QA_THREADS
+    )
+
+# One pooled provider for every OpenAI/LangChain call in the process
+llm_provider = LLMProvider.from_env()
+
+registry.register('feedback_chain', lambda: llm_provider.create_chain(
+    FEEDBACK_PROMPT, ["answer"], temperature=0.3  # Lower temperature for more consistent output
+))
+registry.register('question_chain', lambda: llm_provider.create_chain(
+    QUESTION_GENERATION_PROMPT, ["position", "num_questions"], temperature=0.7
+))
+registry.register('qa_tokenizer', load_qa_tokenizer)
+
+def load_qa_token_embeddings():
+    # Only the input embedding matrix is kept, for answer similarity in automatic scoring.
+    # Mapped from the safetensors file where possible, so all workers share one copy
+    weights_path = os.path.join(model_path, 'model.safetensors')
+    if os.path.exists(weights_path):
+        embeddings = mmap_safetensor(weights_path, 'word_embeddings.weight')
+        if embeddings is not None:
+            return embeddings
+    from transformers import AutoModelForQuestionAnswering
+    model = AutoModelForQuestionAnswering.from_pretrained(model_path, local_files_only=True)
+    return model.get_input_embeddings().weight.detach().numpy().copy()
+
+registry.register('qa_token_embeddings', load_qa_token_embeddings)
+
+# Concurrent QA requests are collected for a few milliseconds and run as one batch;
+# requests beyond QA_MAX_QUEUE waiting pairs get a 429
+qa_executor = QABatcher(
+    lambda: registry.get('qa_pipeline'),
+    max_batch_size=int(os.getenv('QA_BATCH_SIZE', 16)),
+    max_wait_ms=float(os.getenv('QA_BATCH_WAIT_MS', 5)),
+    max_concurrency=QA_MAX_CONCURRENCY,
+    max_queue=int(os.getenv('QA_MAX_QUEUE', 256))
 )
 
+# With QA_INFERENCE_SOCKET set, web workers don't load the model: they send pairs
+# to the `flask qa-server` process, which holds the only copy and batches across workers
+QA_INFERENCE_SOCKET = os.getenv('QA_INFERENCE_SOCKET')
+if QA_INFERENCE_SOCKET:
+    qa_batcher = RemoteQABatcher(
+        QA_INFERENCE_SOCKET,
+        max_connections=int(os.getenv('QA_INFERENCE_CONNECTIONS', 16)),
+        timeout=float(os.getenv('QA_INFERENCE_TIMEOUT', 60))
+    )
+else:
+    registry.register('qa_pipeline', load_qa_pipeline)
+    qa_batcher = qa_executor
+
 def get_answer(question, context):
+    # Ensure context is not empty
+    if not context or not context.strip():
+        context = question  # Use question as context if none provided
+
+    logger.debug("Processing question: %s", question)
+    logger.debug("Using context: %s", context)
+
+    result = get_answers([(question, context)])[0]
+
+    logger.debug("QA pipeline result: %s", result)
+
+    return result
+
+def get_answers(pairs, block=False):
+    """
+    Answer several (question, context) pairs, serving repeats from the answer cache
+    and running the rest through the QA pipeline in one batched pass.
+
+    Args:
+        pairs (list): List of (question, context) tuples
+        block (bool): Wait for room in the QA queue instead of raising CapacityExceeded
+
+    Returns:
+        list: List of {'score', 'answer'} dictionaries in input order
+    """
+    # Use the question as context where none was provided, as get_answer does
+    pairs = [(q, c if c and c.strip() else q) for q, c in pairs]
+    keys = [qa_cache_key(q, c) for q, c in pairs]
+    answers = lookup_cached_answers(keys)
+
+    # Tokenized at test creation where possible, so only the forward pass is left
+    uncached = [pair for key, pair in zip(keys, pairs) if key not in answers]
+    encodings = lookup_qa_encodings([text for pair in uncached for text in pair])
+
+    # Submit each uncached pair once, even if it appears several times
+    futures = {}
     try:
-        # Ensure context is not empty
-        if not context or not context.strip():
-            context = question  # Use question as context if none provided
-            
-        print(f"Processing question: {question}")
-        print(f"Using context: {context}")
-            
-        result = qa_pipeline({
-            "question": question,
-            "context": context
-        })
-        
-        print(f"QA pipeline result: {result}")
-        
-        return {
-            "score": result["score"],
-            "answer": result["answer"]
-        }
+        for key, (q, c) in zip(keys, pairs):
+            if key not in answers and key not in futures:
+                pair_encodings = (encodings[q], encodings[c]) if q in encodings and c in encodings else None
+                futures[key] = qa_batcher.submit(q, c, pair_encodings, block=block)
+    except CapacityExceeded:
+        # Don't spend the model's time on a request that is being turned away
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    computed = {}
+    for key, future in futures.items():
+        try:
+            result = future.result()
+            computed[key] = {
+                "score": result["score"],
+                "answer": result["answer"]
+            }
+        except CapacityExceeded:
+            # Turned away by the inference server rather than on submit
+            for other in futures.values():
+                other.cancel()
+            raise
+        except Exception as e:
+            logger.error("Error in QA pipeline: %s", e)
+            answers[key] = {
+                "score": 0.0,
+                "answer": f"Error processing the question: {str(e)}",
+                "error": True
+            }
+
+    # Only successful answers are cached so failures are retried next time
+    store_cached_answers(computed)
+    answers.update(computed)
+    return [answers[key] for key in keys]
+
+_qa_model_revision = None
+
+def qa_model_revision():
+    """
+    Identify the QA model build, so cached answers are invalidated when ./model changes.
+
+    Uses QA_MODEL_REVISION if set, otherwise a fingerprint of the model files'
+    names, sizes and modification times (cheap, doesn't load the model).
+    """
+    global _qa_model_revision
+    if _qa_model_revision is None:
+        revision = os.getenv('QA_MODEL_REVISION')
+        if not revision:
+            fingerprint = hashlib.sha256()
+            if os.path.isdir(model_path):
+                for name in sorted(os.listdir(model_path)):
+                    stat = os.stat(os.path.join(model_path, name))
+                    fingerprint.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+            revision = fingerprint.hexdigest()
+        _qa_model_revision = revision
+    return _qa_model_revision
+
+def qa_cache_key(question, context):
+    # Quantized runtimes can answer slightly differently, so they don't share cached answers
+    payload = json.dumps([qa_model_revision(), QA_RUNTIME, question, context])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def qa_encoding_key(text):
+    return hashlib.sha256(f"{qa_model_revision()}\n{text}".encode('utf-8')).hexdigest()
+
+def lookup_qa_encodings(texts):
+    """
+    Returns:
+        dict: text -> TextEncoding, for the texts that have been encoded already
+    """
+    if not app.config['QA_PRECOMPUTED_ENCODINGS'] or not texts:
+        return {}
+    keys = {qa_encoding_key(text): text for text in set(texts)}
+    try:
+        with cache_session() as session:
+            rows = session.execute(
+                select(QAEncoding.key, QAEncoding.token_ids, QAEncoding.offsets).where(QAEncoding.key.in_(list(keys)))
+            ).all()
     except Exception as e:
-        print(f"Error in QA pipeline: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        return {
-            "score": 0.0,
-            "answer": f"Error processing the question: {str(e)}"
-        }
+        logger.warning("Error reading QA encodings: %s", e)
+        return {}
+    return {keys[row.key]: TextEncoding.from_bytes(row.token_ids, row.offsets) for row in rows}
+
+def encode_qa_texts(texts):
+    """
+    Tokenize questions and contexts for the QA model and store the encodings,
+    skipping texts that are already stored. Runs when tests are created.
+
+    Returns:
+        int: Number of texts encoded
+    """
+    keys = {qa_encoding_key(text): text for text in set(texts) if text and text.strip()}
+    if not keys:
+        return 0
+    existing = {key for (key,) in db.session.query(QAEncoding.key).filter(QAEncoding.key.in_(list(keys)))}
+    missing = {key: text for key, text in keys.items() if key not in existing}
+    if not missing:
+        return 0
+
+    tokenizer = registry.get('qa_tokenizer')
+    rows = []
+    for key, text in missing.items():
+        token_ids, offsets = TextEncoding.from_text(tokenizer, text).to_bytes()
+        rows.append({'key': key, 'token_ids': token_ids, 'offsets': offsets})
+    try:
+        db.session.execute(insert(QAEncoding), rows)
+        db.session.commit()
+    except IntegrityError:
+        # Encoded concurrently by another request
+        db.session.rollback()
+        return 0
+    return len(rows)
+
+def queue_qa_encodings(questions):
+    """Encode the texts and contexts of new questions in the background."""
+    if app.config['QA_PRECOMPUTED_ENCODINGS']:
+        texts = [text for question in questions for text in (question.get('text'), question.get('context'))]
+        encoding_pool.submit(encode_qa_texts, texts)
+
+qa_cache_stats = {'hits': 0, 'misses': 0}
+qa_cache_stats_lock = threading.Lock()
+
+def cache_session():
+    """
+    A short-lived session with its own connection for the QA caches, so their
+    commits and rollbacks never touch the caller's pending changes in db.session.
+    """
+    return Session(db.engine)
+
+def insert_ignoring_duplicates(session, model, rows, key_column):
+    """
+    Insert rows, skipping those whose `key_column` value is already stored
+    (for instance written concurrently by another request) instead of failing
+    the whole batch. Other databases fall back to a plain insert.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        statement = sqlite_insert(model).on_conflict_do_nothing(index_elements=[key_column])
+    elif dialect == 'postgresql':
+        statement = postgresql_insert(model).on_conflict_do_nothing(index_elements=[key_column])
+    else:
+        statement = insert(model)
+    session.execute(statement, rows)
+
+def lookup_cached_answers(keys):
+    found = {}
+    try:
+        with cache_session() as session:
+            rows = session.execute(
+                select(QAAnswerCache.id, QAAnswerCache.key, QAAnswerCache.answer, QAAnswerCache.score,
+                       QAAnswerCache.last_used_at).where(QAAnswerCache.key.in_(set(keys)))
+            ).all()
+            for row in rows:
+                found[row.key] = {
+                    "score": row.score,
+                    "answer": row.answer
+                }
+
+            # Hits are read-only; recency for eviction is refreshed in one UPDATE, and
+            # only for entries not touched within QA_CACHE_TOUCH_SECONDS
+            now = datetime.utcnow()
+            touch_before = now - timedelta(seconds=app.config['QA_CACHE_TOUCH_SECONDS'])
+            stale_ids = [row.id for row in rows if row.last_used_at is None or row.last_used_at < touch_before]
+            if stale_ids:
+                session.execute(
+                    update(QAAnswerCache).where(QAAnswerCache.id.in_(stale_ids))
+                    .values(last_used_at=now, hits=QAAnswerCache.hits + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                session.commit()
+    except Exception as e:
+        logger.warning("Error reading QA answer cache: %s", e)
+
+    hits = sum(1 for key in keys if key in found)
+    with qa_cache_stats_lock:
+        qa_cache_stats['hits'] += hits
+        qa_cache_stats['misses'] += len(keys) - hits
+    return found
+
+def store_cached_answers(answers):
+    if not answers:
+        return
+    try:
+        with cache_session() as session:
+            now = datetime.utcnow()
+            insert_ignoring_duplicates(session, QAAnswerCache, [
+                {'key': key, 'answer': result['answer'], 'score': result['score'], 'hits': 0,
+                 'created_at': now, 'last_used_at': now}
+                for key, result in answers.items()
+            ], 'key')
+            session.commit()
+
+            # Evict least recently used entries beyond the configured size
+            excess = session.scalar(select(func.count(QAAnswerCache.id))) - app.config['QA_CACHE_MAX_ENTRIES']
+            if excess > 0:
+                stale_ids = session.scalars(
+                    select(QAAnswerCache.id).order_by(QAAnswerCache.last_used_at).limit(excess)
+                ).all()
+                session.execute(
+                    delete(QAAnswerCache).where(QAAnswerCache.id.in_(stale_ids)).execution_options(synchronize_session=False)
+                )
+                session.commit()
+    except Exception as e:
+        # The session rolls back on exit
+        logger.warning("Error writing QA answer cache: %s", e)
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///interview.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///interview.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLITE_WAL'] = os.getenv('SQLITE_WAL', '1') == '1'
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Wait for locks instead of failing immediately when candidates write concurrently
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+else:
+    # Pooled connections for server databases such as postgresql://
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
 app.config['SECRET_KEY'] = 'your-secret-key-here'  # Change this to a secure secret key in production
+app.config['QA_CACHE_MAX_ENTRIES'] = int(os.getenv('QA_CACHE_MAX_ENTRIES', 10000))
+app.config['QA_CACHE_TOUCH_SECONDS'] = int(os.getenv('QA_CACHE_TOUCH_SECONDS', 300))
+app.config['QA_PRECOMPUTED_ENCODINGS'] = os.getenv('QA_PRECOMPUTED_ENCODINGS', '1') == '1'
+app.config['AUDIO_STORAGE_DIR'] = os.getenv('AUDIO_STORAGE_DIR', os.path.join(app.instance_path, 'audio'))
+app.config['ADMIN_PAGE_SIZE'] = int(os.getenv('ADMIN_PAGE_SIZE', 50))
+app.config['AUDIO_INLINE_MAX_BYTES'] = int(os.getenv('AUDIO_INLINE_MAX_BYTES', 4 * 1024 * 1024))
+app.config['TRANSCRIPTION_JOB_TIMEOUT'] = int(os.getenv('TRANSCRIPTION_JOB_TIMEOUT', 600))
+app.config['WARM_TOKEN'] = os.getenv('WARM_TOKEN')  # Lets deploy hooks POST /healthz/warm without logging in
+app.config['TTS_CACHE_DIR'] = os.getenv('TTS_CACHE_DIR', os.path.join(app.instance_path, 'tts'))
+app.config['TTS_MAX_AGE'] = int(os.getenv('TTS_MAX_AGE', 7 * 24 * 3600))
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection) or not app.config['SQLITE_WAL']:
+        return
+    # WAL lets readers proceed while a candidate's answer is being written
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 # Assuming `db` is already initialized
 migrate = Migrate(app, db)
 
+# Answers are transcribed off the request thread so uploads return immediately
+transcription_backend = create_transcription_backend(provider=llm_provider, torch_threads=QA_THREADS)
+if isinstance(transcription_backend, LocalWhisperBackend):
+    registry.register('speech_model', transcription_backend.load)
+
+# Answers uploaded in timeslices are transcribed while the candidate is still speaking
+transcription_streams = TranscriptionStreamManager(
+    os.path.join(app.instance_path, 'streams'),
+    transcription_backend,
+    lambda fn, *args: transcription_pool.submit(fn, *args)
+)
+
+# Identical transcripts (retries, re-submissions) share one LLM feedback call
+feedback_cache = CoalescingCache(
+    max_entries=int(os.getenv('FEEDBACK_CACHE_MAX_ENTRIES', 1000)),
+    ttl_seconds=float(os.getenv('FEEDBACK_CACHE_TTL', 3600))
+)
+audio_store = AudioStore(app.config['AUDIO_STORAGE_DIR'])
+transcription_pool = BackgroundWorkerPool(app, max_workers=int(os.getenv('TRANSCRIPTION_WORKERS', 4)), name='transcription')
+
+# Question audio is synthesized once per text and language, then served from cache
+tts_cache = TTSCache(
+    app.config['TTS_CACHE_DIR'],
+    create_synthesizer(),
+    memory_entries=int(os.getenv('TTS_MEMORY_CACHE_ENTRIES', 256)),
+    disk_entries=int(os.getenv('TTS_DISK_CACHE_ENTRIES', 10000)),
+    limiter=ConcurrencyLimiter(
+        'tts',
+        max_concurrent=int(os.getenv('TTS_MAX_CONCURRENCY', 8)),
+        max_wait=float(os.getenv('TTS_QUEUE_TIMEOUT', 10))
+    )
+)
+tts_pool = BackgroundWorkerPool(app, max_workers=int(os.getenv('TTS_WORKERS', 2)), name='tts')
+
+# Completed tests are evaluated and scored in the background
+scoring_pool = BackgroundWorkerPool(app, max_workers=int(os.getenv('SCORING_WORKERS', 2)), name='scoring')
+
+# Questions and contexts are tokenized for the QA model when tests are created
+encoding_pool = BackgroundWorkerPool(app, max_workers=1, name='qa-encoding')
+
+# Request latency and per-stage timings, exported in the Prometheus format at /metrics
+http_request_seconds = metrics.histogram(
+    'interview_http_request_duration_seconds',
+    'Duration of HTTP requests',
+    ['method', 'endpoint', 'status']
+)
+metrics.gauge('interview_qa_batch_queue_depth', 'Question/context pairs waiting for the QA model').set_function(
+    lambda: qa_batcher.queue_depth
+)
+qa_cache_lookups = metrics.counter('interview_qa_cache_lookups_total', 'QA answer cache lookups', ['result'])
+qa_cache_lookups.set_function(lambda: qa_cache_stats['hits'], result='hit')
+qa_cache_lookups.set_function(lambda: qa_cache_stats['misses'], result='miss')
+feedback_cache_lookups = metrics.counter(
+    'interview_feedback_cache_lookups_total', 'Feedback cache lookups', ['result']
+)
+for result, stat in (('hit', 'hits'), ('miss', 'misses'), ('coalesced', 'coalesced')):
+    feedback_cache_lookups.set_function(lambda stat=stat: feedback_cache.stats()[stat], result=result)
+
+def record_request_stage(stage, seconds):
+    # Stages timed on worker threads (background jobs, QA batches) only go to the histogram
+    if has_request_context() and 'stage_timings' in g:
+        g.stage_timings[stage] = g.stage_timings.get(stage, 0.0) + seconds
+
+add_stage_listener(record_request_stage)
+
+@event.listens_for(Session, 'before_commit')
+def start_commit_timer(session):
+    session.info['commit_started'] = time.perf_counter()
+
+@event.listens_for(Session, 'after_commit')
+def stop_commit_timer(session):
+    started = session.info.pop('commit_started', None)
+    if started is not None:
+        seconds = time.perf_counter() - started
+        stage_seconds.observe(seconds, stage='db_commit')
+        record_request_stage('db_commit', seconds)
+
+@event.listens_for(Session, 'after_rollback')
+def clear_commit_timer(session):
+    session.info.pop('commit_started', None)
+
+@app.errorhandler(CapacityExceeded)
+def capacity_exceeded(e):
+    response = jsonify({
+        'status': 'error',
+        'message': str(e)
+    })
+    response.status_code = e.status
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.stage_timings = {}
+
+@app.after_request
+def record_request_duration(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    seconds = time.perf_counter() - started
+    # Streamed responses are timed to their first byte
+    http_request_seconds.observe(
+        seconds, method=request.method, endpoint=request.endpoint or 'unmatched', status=response.status_code
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        stages = " ".join(f"{stage}={value * 1000:.1f}ms" for stage, value in g.stage_timings.items())
+        logger.debug(
+            "%s %s %s %.1fms %s", request.method, request.path, response.status_code, seconds * 1000, stages
+        )
+    return response
+
+# Caps how many question-generation LLM calls a bulk request runs at once
+question_pool = BackgroundWorkerPool(
+    app, max_workers=int(os.getenv('QUESTION_GENERATION_CONCURRENCY', 4)), name='question-generation'
+)
+
 # Models
 class Candidate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     position = db.Column(db.String(100), nullable=False)
-    score = db.Column(db.Float, default=0.0)
-    feedback_status = db.Column(db.String(20), default='Pending')
+    score = db.Column(db.Float, default=0.0)  # Mean of the candidate's scored tests
+    feedback_status = db.Column(db.String(20), default='Pending')  # Pending, In Progress, Completed
+    # Running totals behind `score`, adjusted per test instead of rescanning every test
+    score_total = db.Column(db.Float, default=0.0)
+    scored_tests = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     tests = db.relationship('Test', backref='candidate', lazy=True)
 
@@ -98,10 +561,15 @@ class Test(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='Pending')  # Pending, In Progress, Completed
-    questions = db.relationship('Question', backref='test', lazy=True)
+    auto_scored_at = db.Column(db.DateTime)  # Set when a scoring job claims the test, and again once it's scored
+    score = db.Column(db.Float)  # Mean question score, counted into the candidate's score
+    questions = db.relationship('Question', backref='test', lazy=True, order_by='Question.order')
+
+    # The scoring batch looks for completed tests that haven't been scored yet
+    __table_args__ = (db.Index('ix_test_status_auto_scored_at', 'status', 'auto_scored_at'),)
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -112,7 +580,19 @@ class Question(db.Model):
     answer = db.Column(db.Text)
     audio_path = db.Column(db.String(200))
     score = db.Column(db.Float)
-    feedback = db.Column(db.Text)
+    feedback = db.Column(db.Text)  # The admin's own comments; LLM feedback is kept in the fields below
+    # LLM feedback sections; rendered by the templates and pages, not stored as HTML
+    feedback_grammar = db.Column(db.Text)
+    feedback_fluency = db.Column(db.Text)
+    feedback_suggestions = db.Column(db.Text)
+    feedback_prompt_version = db.Column(db.String(16))  # FEEDBACK_PROMPT_VERSION that produced it; NULL for fallback or migrated feedback
+    model_answer = db.Column(db.Text)  # QA model's answer from the context, saved by automatic scoring
+    auto_score = db.Column(db.Float)  # Provisional 0-10 score from automatic scoring
+
+    # Questions are always fetched per test in display order
+    __table_args__ = (db.Index('ix_question_test_id_order', 'test_id', 'order'),)
+
+FEEDBACK_COLUMNS = (Question.feedback_grammar, Question.feedback_fluency, Question.feedback_suggestions)
 
 
 class User(db.Model):
@@ -124,6 +604,159 @@ class User(db.Model):
 class SampleQuestion(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.String(500), nullable=False)
+    # Question bank: generated questions are kept per (normalized) position and reused
+    position = db.Column(db.String(100))
+    context = db.Column(db.Text)
+    text_hash = db.Column(db.String(64))  # sha256 of the normalized question text
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_sample_question_position_hash', 'position', 'text_hash', unique=True),
+    )
+
+class TranscriptionJob(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), default='Queued')  # Queued, Running, Completed, Failed
+    audio_path = db.Column(db.String(200))
+    evaluate = db.Column(db.Boolean, default=False)  # Also generate feedback after transcribing
+    transcript = db.Column(db.Text)
+    score = db.Column(db.Float)
+    feedback = db.Column(db.Text)  # JSON of the feedback sections
+    error = db.Column(db.String(500))
+    timings = db.Column(db.Text)  # JSON of per-stage durations in seconds
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+class QAEncoding(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of model revision + text
+    token_ids = db.Column(db.LargeBinary, nullable=False)  # little-endian uint32 per token
+    offsets = db.Column(db.LargeBinary, nullable=False)  # little-endian uint32 (start, end) character pairs
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class QAAnswerCache(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of model revision + question + context
+    answer = db.Column(db.Text, nullable=False)
+    score = db.Column(db.Float)
+    hits = db.Column(db.Integer, default=0, nullable=False)  # Lookups that refreshed last_used_at
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Refreshed at most every QA_CACHE_TOUCH_SECONDS
+
+def upgrade_schema():
+    """
+    Bring an existing database up to the current models: create missing tables,
+    then add any columns and indexes the models declare but the database lacks.
+    Safe to run repeatedly.
+
+    Returns:
+        list: Descriptions of the changes that were applied
+    """
+    db.create_all()
+    changes = []
+    inspector = inspect(db.engine)
+    # All DDL runs on the session's connection: on PostgreSQL an ALTER TABLE holds its
+    # lock until commit, so an index created from another connection would wait on it forever
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                changes.append(f"added column {table.name}.{column.name}")
+
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(connection, checkfirst=True)
+                changes.append(f"created index {index.name}")
+    db.session.commit()
+
+    migrated = migrate_feedback_rows()
+    if migrated:
+        changes.append(f"moved {migrated} HTML feedback row(s) into feedback sections")
+    return changes
+
+def migrate_feedback_rows(batch_size=500):
+    """
+    Move LLM feedback stored as HTML in question.feedback into the section
+    columns, leaving question.feedback for the admin's own comments.
+    Rows that don't match the old format are left alone.
+
+    Returns:
+        int: Number of rows migrated
+    """
+    migrated, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(Question.id, Question.feedback).where(
+                Question.id > last_id,
+                Question.feedback_grammar.is_(None),
+                Question.feedback.like('%<strong>Grammar:</strong>%')
+            ).order_by(Question.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return migrated
+        last_id = rows[-1].id
+
+        values = []
+        for row in rows:
+            sections = parse_feedback_html(row.feedback)
+            if sections:
+                values.append({'id': row.id, 'feedback': None, **{f'feedback_{k}': v for k, v in sections.items()}})
+        if values:
+            db.session.execute(update(Question), values)
+            db.session.commit()
+            migrated += len(values)
+
+@app.cli.command('encode-questions')
+def encode_questions_command():
+    """Precompute QA encodings for every stored question and context."""
+    rows = db.session.query(Question.text, Question.context).distinct().all()
+    count = encode_qa_texts([text for row in rows for text in row])
+    click.echo(f"Encoded {count} new text(s)")
+
+@app.cli.command('qa-parity')
+@click.option('--runtime', default=None, help='Runtime to compare with the full-precision model (default: QA_RUNTIME)')
+@click.option('--limit', default=200, help='Number of stored questions to compare on')
+def qa_parity_command(runtime, limit):
+    """Check that a QA runtime answers stored questions like the full-precision model."""
+    rows = db.session.query(Question.text, Question.context).filter(
+        Question.context.isnot(None), Question.context != ''
+    ).distinct().limit(limit).all()
+    if not rows:
+        click.echo("No questions with a context to compare on")
+        return
+    result = parity_check(load_qa_pipeline('torch'), load_qa_pipeline(runtime), [tuple(row) for row in rows])
+    for name, value in result.items():
+        click.echo(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+
+@app.cli.command('qa-server')
+@click.option('--socket', 'socket_path', default=None, help='Unix socket to listen on (default: QA_INFERENCE_SOCKET)')
+def qa_server_command(socket_path):
+    """Load the QA model once and answer the web workers' QA requests over a Unix socket."""
+    socket_path = socket_path or QA_INFERENCE_SOCKET
+    if not socket_path:
+        raise click.UsageError("Set QA_INFERENCE_SOCKET or pass --socket")
+    registry.register('qa_pipeline', load_qa_pipeline)
+    registry.get('qa_pipeline')
+    server = QAInferenceServer(socket_path, qa_executor)
+    click.echo(f"QA inference server listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+
+@app.cli.command('upgrade-schema')
+def upgrade_schema_command():
+    """Add missing tables, columns and indexes to the database."""
+    changes = upgrade_schema()
+    for change in changes:
+        click.echo(change)
+    click.echo(f"Schema up to date ({len(changes)} change(s) applied)")
 
 def create_default_admin():
     # Check if the admin user already exists
@@ -176,6 +809,30 @@ def role_required(role):
         return decorated_function
     return decorator
 
+def keyset_page(query, key_column):
+    """
+    Return one page of `query` ordered by `key_column`, continuing after the key
+    in the `after` request argument (keyset pagination, so deep pages stay cheap).
+
+    Args:
+        query: The query to paginate
+        key_column: A unique, indexed column such as the primary key
+
+    Returns:
+        tuple: (items, next_after) where next_after is None on the last page
+    """
+    limit = max(1, min(request.args.get('limit', app.config['ADMIN_PAGE_SIZE'], type=int), 500))
+    after = request.args.get('after', type=int)
+    if after is not None:
+        query = query.filter(key_column > after)
+
+    # Fetch one extra row to know whether another page exists
+    items = query.order_by(key_column).limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        return items, getattr(items[-1], key_column.key)
+    return items, None
+
 # Routes
 @app.route('/')
 def index():
@@ -261,7 +918,7 @@ def candidate_home():
         db.session.commit()
         
         # Add sample questions to the test
-        sample_questions = SampleQuestion.query.limit(3).all()
+        sample_questions = SampleQuestion.query.filter(SampleQuestion.position.is_(None)).limit(3).all()
         for i, question_text in enumerate(sample_questions[:3], 1):  # Add first 3 sample questions
             question = Question(
                 test_id=test.id,
@@ -298,7 +955,13 @@ def manage_test(test_id):
     
     if request.method == 'DELETE':
         try:
-            # Delete all questions associated with the test
+            # Take the test's score out of the candidate's running score
+            adjust_candidate_score(test.candidate_id, committed_test_score(test_id), None)
+
+            # Delete all questions associated with the test, after the transcription jobs that reference them
+            TranscriptionJob.query.filter(
+                TranscriptionJob.question_id.in_(select(Question.id).where(Question.test_id == test_id))
+            ).delete(synchronize_session=False)
             Question.query.filter_by(test_id=test_id).delete()
             
             # Delete the test
@@ -318,12 +981,17 @@ def manage_test(test_id):
     
     # GET request - return test details
     try:
+        # Only the columns the modal shows; contexts can be long
+        test_questions = Question.query.filter_by(test_id=test_id).options(
+            load_only(Question.text, Question.answer, Question.score, Question.feedback, *FEEDBACK_COLUMNS)
+        ).order_by(Question.order).all()
         questions = [{
             'text': q.text,
             'answer': q.answer,
             'score': q.score,
-            'feedback': q.feedback
-        } for q in test.questions]
+            'feedback': feedback_sections(q),
+            'admin_feedback': q.feedback
+        } for q in test_questions]
         return jsonify({
             'status': 'success',
             'test': {
@@ -351,10 +1019,52 @@ def candidate_question(question_id):
     
     return render_template('candidate_question.html', 
                           question=question, 
+                          feedback=feedback_sections(question),
                           test=test, 
                           all_questions=all_questions,
                           current_index=current_index)
 
+def queue_answer(question, audio_file, evaluate=False):
+    """
+    Store an uploaded recording and queue it for background processing.
+
+    Args:
+        question (Question): The question being answered
+        audio_file (FileStorage): The uploaded recording
+        evaluate (bool): Also generate LLM feedback in the same job
+
+    Returns:
+        TranscriptionJob: The queued job
+    """
+    start = time.perf_counter()
+    extension = audio_extension(audio_file.mimetype)
+    limit = app.config['AUDIO_INLINE_MAX_BYTES']
+
+    # Small recordings stay in memory and go straight to the transcriber;
+    # larger ones are streamed to disk in chunks and read back by the job
+    audio_bytes = audio_file.stream.read(limit + 1)
+    if len(audio_bytes) <= limit:
+        with timed_stage('upload_save'):
+            question.audio_path = audio_store.save_bytes(audio_bytes, question.id, extension)
+    else:
+        audio_file.stream.seek(0)
+        with timed_stage('upload_save'):
+            question.audio_path = audio_store.save_stream(audio_file.stream, question.id, extension)
+        audio_bytes = None
+
+    job = TranscriptionJob(
+        id=str(uuid.uuid4()),
+        question_id=question.id,
+        audio_path=question.audio_path,
+        evaluate=evaluate,
+        timings=json.dumps({'upload_save': time.perf_counter() - start})
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    transcription_pool.submit(run_transcription_job, job.id, audio_bytes)
+    return job
+
 @app.route('/api/record-answer', methods=['POST'])
 @login_required
 @role_required('candidate')
@@ -367,201 +1077,458 @@ def record_answer():
         if not audio_file:
             return jsonify({'status': 'error', 'message': 'No audio file provided'}), 400
 
-        # Save the audio file temporarily
-        temp_path = os.path.join(app.root_path, 'temp_audio.webm')
-        audio_file.save(temp_path)
-
-        try:
-            # Read the file and prepare it for Whisper
-            with open(temp_path, 'rb') as audio_file:
-                # Send the file to OpenAI Whisper with improved parameters
-                client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-                response = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text",
-                    language="en",
-                    temperature=0.2,
-                    prompt="This is an interview answer. Please transcribe it accurately."
-                )
-
-            # Clean up the temporary file
-            os.remove(temp_path)
-
-            if not response or not response.strip():
-                return jsonify({
-                    'status': 'error',
-                    'message': 'No transcript was generated. Please try recording again.'
-                }), 400
-
-            # Update the question with the transcribed answer
-            question.answer = response.strip()
-            db.session.commit()
-            
-            print("--------------------------------")
-            print("Transcribed text:", question.answer)
-            print("--------------------------------")
-            
-            return jsonify({
-                'status': 'success',
-                'transcript': question.answer
-            })
+        job = queue_answer(question, audio_file)
 
-        except Exception as e:
-            # Clean up the temporary file in case of error
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            print(f"Error during transcription: {str(e)}")
-            raise e
+        return jsonify({
+            'status': 'success',
+            'job_id': job.id,
+            'job_status': job.status
+        }), 202
 
     except Exception as e:
-        print(f"Error in record_answer: {str(e)}")
+        logger.exception("Error in record_answer")
         return jsonify({
             'status': 'error',
             'message': 'Error processing your recording. Please try again.'
         }), 500
 
-@app.route('/api/submit-feedback', methods=['POST'])
+@app.route('/api/record-and-evaluate', methods=['POST'])
 @login_required
 @role_required('candidate')
-def submit_feedback():
-    question_id = request.json.get('question_id')
-    transcript = request.json.get('transcript')
+def record_and_evaluate():
+    question_id = request.form.get('question_id')
     question = Question.query.get_or_404(question_id)
-    
+
     try:
-        # Create a separate LLM instance specifically for feedback
-        feedback_llm = OpenAI(temperature=0.3)  # Lower temperature for more consistent output
-        
-        # Generate feedback using LLM with a specific format
-        feedback_prompt = PromptTemplate(
-            input_variables=["answer"],
-            template="""You are an expert English language evaluator. Your task is to evaluate the grammatical correctness and fluency of the following answer.
+        audio_file = request.files.get('audio')
+        if not audio_file:
+            return jsonify({'status': 'error', 'message': 'No audio file provided'}), 400
+
+        # Transcription and feedback run back to back in one background job
+        job = queue_answer(question, audio_file, evaluate=True)
 
-            Answer: {answer}
-            
-            IMPORTANT: This text has been converted from speech using speech-to-text technology. 
-            Please be understanding of potential transcription errors and focus on evaluating the 
-            grammatical structure and fluency that can be reasonably inferred from the text.
-            
-            Please evaluate ONLY the grammatical correctness and fluency of the answer, NOT the content or correctness of the information.
-            
-            Provide your evaluation in the EXACT format below:
-            
-            SCORE: [number between 1-10]
-            GRAMMAR: [brief assessment of grammar]
-            FLUENCY: [brief assessment of fluency]
-            SUGGESTIONS: [2-3 specific suggestions for improvement]
-            
-            Do not deviate from this format. Do not evaluate the content or correctness of the answer.
-            """
-        )
-        
-        # Create a chain for feedback generation
-        feedback_chain = LLMChain(llm=feedback_llm, prompt=feedback_prompt)
-        
-        # Generate feedback
-        feedback_result = feedback_chain.run(answer=transcript)
-        
-        # Parse the feedback result more robustly
-        score = 7.0  # Default score if parsing fails
-        grammar = "Grammar assessment not available"
-        fluency = "Fluency assessment not available"
-        suggestions = "No suggestions available"
-        
-        # Try to extract feedback components
-        try:
-            # Split by newlines and look for specific sections
-            lines = feedback_result.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line.startswith('SCORE:'):
-                    try:
-                        score_text = line.split('SCORE:')[1].strip()
-                        # Extract just the number
-                        score = float(score_text.split()[0])
-                    except (ValueError, IndexError):
-                        # If parsing fails, keep default score
-                        pass
-                elif line.startswith('GRAMMAR:'):
-                    grammar = line.split('GRAMMAR:')[1].strip()
-                elif line.startswith('FLUENCY:'):
-                    fluency = line.split('FLUENCY:')[1].strip()
-                elif line.startswith('SUGGESTIONS:'):
-                    suggestions = line.split('SUGGESTIONS:')[1].strip()
-                    # Add any remaining lines
-                    remaining_lines = [l.strip() for l in lines[lines.index(line)+1:] if l.strip()]
-                    if remaining_lines:
-                        suggestions += "\n" + "\n".join(remaining_lines)
-        except Exception as e:
-            print(f"Error parsing feedback result: {str(e)}")
-            # Keep default values if parsing fails
-        
-        # Format the feedback text
-        suggestions_html = suggestions.replace('\n', '<br>')
-        feedback_text = f"""
-        <p><strong>Grammar:</strong> {grammar}</p>
-        <p><strong>Fluency:</strong> {fluency}</p>
-        <p><strong>Suggestions for improvement:</strong></p>
-        <p>{suggestions_html}</p>
-        """
-        
-        # Update the question with the generated feedback
-        question.feedback = feedback_text
-        question.score = score
-        db.session.commit()
-        
         return jsonify({
             'status': 'success',
-            'score': score,
-            'feedback': feedback_text
-        })
-        
+            'job_id': job.id,
+            'job_status': job.status
+        }), 202
+
     except Exception as e:
-        print(f"Error generating feedback: {str(e)}")
-        # Return a default response in case of error
+        logger.exception("Error in record_and_evaluate")
         return jsonify({
-            'status': 'success',
-            'score': 7.0,
-            'feedback': """
-            <p><strong>Grammar:</strong> Unable to assess grammar at this time.</p>
-            <p><strong>Fluency:</strong> Unable to assess fluency at this time.</p>
-            <p><strong>Suggestions for improvement:</strong></p>
-            <p>Please try recording your answer again.</p>
-            """
-        })
+            'status': 'error',
+            'message': 'Error processing your recording. Please try again.'
+        }), 500
 
-@app.route('/api/complete-test/<int:test_id>', methods=['POST'])
-@login_required
-@role_required('candidate')
-def complete_test(test_id):
-    test = Test.query.get_or_404(test_id)
-    test.status = 'Completed'
+def run_transcription_job(job_id, audio_bytes=None):
+    """
+    Transcribe a queued recording and store the transcript on its question,
+    then generate feedback as well if the job asks for it.
+
+    Runs on the transcription worker pool inside an application context.
+    `audio_bytes` carries small recordings in memory so they aren't re-read
+    from the audio store. The transcript, feedback and job result are saved
+    in a single commit.
+    """
+    job = TranscriptionJob.query.get(job_id)
+    if not job:
+        return
+
+    start = time.perf_counter()
+    timings = json.loads(job.timings or '{}')
+    timings['queue_wait'] = (datetime.utcnow() - job.created_at).total_seconds()
+    job.status = 'Running'
     db.session.commit()
-    
-    return jsonify({'status': 'success'})
 
-# Admin Routes
-@app.route('/admin')
-@login_required
-@role_required('admin')
-def admin_dashboard():
-    # Create example data if no candidates exist
-    if Candidate.query.count() == 0:
-        create_example_data()
-    
-    candidates = Candidate.query.all()
-    return render_template('admin.html', candidates=candidates)
+    try:
+        filename = os.path.basename(job.audio_path)
+        with timed_stage('transcription'):
+            if audio_bytes is not None:
+                response = transcription_backend.transcribe(BytesIO(audio_bytes), filename=filename)
+            else:
+                with audio_store.open(job.audio_path) as audio_file:
+                    response = transcription_backend.transcribe(audio_file, filename=filename)
+        timings['transcription'] = time.perf_counter() - start
 
-@app.route('/admin/tests')
-@login_required
-@role_required('admin')
-def admin_tests():
-    tests = Test.query.all()
-    return render_template('admin_tests.html', tests=tests)
+        if not response or not response.strip():
+            job.status = 'Failed'
+            job.error = 'No transcript was generated. Please try recording again.'
+        else:
+            # Update the question with the transcribed answer
+            question = Question.query.get(job.question_id)
+            question.answer = response.strip()
+            job.transcript = question.answer
 
-@app.route('/admin/create-test', methods=['GET', 'POST'])
-@login_required
+            logger.debug("Transcribed text for question %s: %s", question.id, question.answer)
+
+            if job.evaluate:
+                feedback_start = time.perf_counter()
+                try:
+                    feedback = apply_feedback(question, parse_feedback(generate_feedback(question.answer)))
+                    job.feedback = json.dumps(feedback)
+                    job.score = question.score
+                except Exception as e:
+                    # Including CapacityExceeded: save no made-up score, so scoring the test generates
+                    # feedback later; the page asks for feedback itself when the job has none
+                    logger.error("Error generating feedback: %s", e)
+                timings['feedback'] = time.perf_counter() - feedback_start
+
+            job.status = 'Completed'
+
+    except Exception as e:
+        logger.exception("Error during transcription job %s", job_id)
+        db.session.rollback()
+        job = TranscriptionJob.query.get(job_id)
+        job.status = 'Failed'
+        job.error = 'Error processing your recording. Please try again.'
+
+    timings['total'] = time.perf_counter() - start
+    job.timings = json.dumps(timings)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+@app.route('/api/answer-stream', methods=['POST'])
+@login_required
+@role_required('candidate')
+def start_answer_stream():
+    question_id = request.json.get('question_id')
+    question = Question.query.get_or_404(question_id)
+
+    stream = transcription_streams.start(question.id, audio_extension(request.json.get('mimetype')))
+    return jsonify({
+        'status': 'success',
+        'stream_id': stream.id
+    })
+
+@app.route('/api/answer-stream/<stream_id>/chunk', methods=['POST'])
+@login_required
+@role_required('candidate')
+def upload_answer_chunk(stream_id):
+    stream = transcription_streams.get(stream_id)
+    if not stream:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired answer stream'}), 404
+
+    audio_file = request.files.get('audio')
+    if not audio_file:
+        return jsonify({'status': 'error', 'message': 'No audio chunk provided'}), 400
+
+    try:
+        transcription_streams.add_chunk(stream, request.form.get('seq', type=int), audio_file.read())
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+
+    return jsonify({
+        'status': 'success',
+        'partial_transcript': stream.transcript
+    }), 202
+
+@app.route('/api/answer-stream/<stream_id>/finish', methods=['POST'])
+@login_required
+@role_required('candidate')
+def finish_answer_stream(stream_id):
+    stream = transcription_streams.get(stream_id)
+    if not stream:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired answer stream'}), 404
+
+    start = time.perf_counter()
+    try:
+        transcript, audio = transcription_streams.finish(stream)
+    except Exception as e:
+        logger.exception("Error finishing answer stream %s", stream_id)
+        return jsonify({
+            'status': 'error',
+            'message': 'Error processing your recording. Please try again.'
+        }), 500
+
+    if not transcript.strip():
+        return jsonify({
+            'status': 'error',
+            'message': 'No transcript was generated. Please try recording again.'
+        }), 400
+
+    # Keep the full recording and the stitched transcript on the question
+    question = Question.query.get(stream.question_id)
+    with timed_stage('upload_save'):
+        question.audio_path = audio_store.save_bytes(audio, question.id, stream.extension)
+    question.answer = transcript.strip()
+    db.session.commit()
+
+    # Feedback starts in the same request: the transcript goes out first, then the feedback as it streams
+    question_id, answer = question.id, question.answer
+    timings = {'finish': time.perf_counter() - start}
+
+    def generate():
+        yield sse_event('transcript', {'text': answer, 'timings': timings})
+        yield from feedback_events(question_id, answer)
+
+    return feedback_event_stream(generate())
+
+@app.route('/api/transcription-job/<job_id>')
+@login_required
+@role_required('candidate')
+def transcription_job_status(job_id):
+    job = TranscriptionJob.query.get_or_404(job_id)
+    # Checked here first, so polling a job in progress doesn't write to the database
+    if job.status in ('Queued', 'Running') and job.created_at and job.created_at < stale_job_cutoff():
+        if fail_stale_transcription_jobs(job_id=job.id):
+            db.session.refresh(job)
+
+    return jsonify({
+        'status': 'success',
+        'job': {
+            'id': job.id,
+            'question_id': job.question_id,
+            'status': job.status,
+            'transcript': job.transcript,
+            'score': job.score,
+            'feedback': job_feedback(job),
+            'error': job.error,
+            'timings': json.loads(job.timings) if job.timings else None
+        }
+    })
+
+def stale_job_cutoff():
+    return datetime.utcnow() - timedelta(seconds=app.config['TRANSCRIPTION_JOB_TIMEOUT'])
+
+def fail_stale_transcription_jobs(job_id=None):
+    """
+    Mark jobs that have been Queued or Running for longer than
+    TRANSCRIPTION_JOB_TIMEOUT as Failed. Jobs run in the in-process worker
+    pool, so a restart loses them and their rows would otherwise never finish.
+
+    Args:
+        job_id (str): Only check this job
+
+    Returns:
+        int: Number of jobs marked as failed
+    """
+    query = update(TranscriptionJob).where(
+        TranscriptionJob.status.in_(['Queued', 'Running']), TranscriptionJob.created_at < stale_job_cutoff()
+    )
+    if job_id is not None:
+        query = query.where(TranscriptionJob.id == job_id)
+    result = db.session.execute(query.values(
+        status='Failed',
+        error='Processing was interrupted, please record your answer again',
+        finished_at=datetime.utcnow()
+    ).execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
+
+def job_feedback(job):
+    if not job.feedback:
+        return None
+    try:
+        return json.loads(job.feedback)
+    except ValueError:
+        # Jobs finished before feedback was stored as sections hold HTML
+        return parse_feedback_html(job.feedback)
+
+def feedback_cache_key(transcript):
+    # Whitespace differences between submissions shouldn't cost another LLM call
+    normalized = " ".join(unicodedata.normalize('NFC', transcript or "").split())
+    key = hashlib.sha256(f"{FEEDBACK_PROMPT_VERSION}\n{normalized}".encode('utf-8')).hexdigest()
+    return normalized, key
+
+def generate_feedback(transcript):
+    """
+    Get the raw LLM feedback for a transcript, reusing earlier results for the same
+    transcript and prompt version and sharing in-flight calls between requests.
+
+    Args:
+        transcript (str): The candidate's transcribed answer
+
+    Returns:
+        str: The unparsed SCORE/GRAMMAR/FLUENCY/SUGGESTIONS completion
+    """
+    normalized, key = feedback_cache_key(transcript)
+
+    return feedback_cache.get_or_compute(
+        key,
+        lambda: llm_provider.timed('feedback', registry.get('feedback_chain').run, answer=normalized)
+    )
+
+def stream_feedback(transcript):
+    """
+    Yield the LLM feedback for a transcript chunk by chunk as it is generated.
+
+    A cached result is yielded in one piece; a freshly streamed one is cached
+    once complete.
+    """
+    normalized, key = feedback_cache_key(transcript)
+
+    cached = feedback_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chain = registry.get('feedback_chain')
+    chunks = []
+    for chunk in llm_provider.timed_stream('feedback_stream', chain.llm.stream(chain.prompt.format(answer=normalized))):
+        chunks.append(chunk)
+        yield chunk
+    feedback_cache.set(key, "".join(chunks))
+
+def feedback_sections(question):
+    """
+    Returns:
+        dict: The question's LLM feedback as 'grammar', 'fluency' and 'suggestions', or None if it has none
+    """
+    sections = {section: getattr(question, f'feedback_{section}') for section in FEEDBACK_SECTIONS}
+    return sections if any(sections.values()) else None
+
+def apply_feedback(question, feedback, prompt_version=FEEDBACK_PROMPT_VERSION):
+    """
+    Store parsed feedback on the question (without committing).
+
+    Args:
+        question (Question): The answered question
+        feedback (dict): 'score', 'grammar', 'fluency' and 'suggestions' from parse_feedback
+        prompt_version (str): Prompt version that produced it; None for fallback feedback
+
+    Returns:
+        dict: The stored sections, as returned by feedback_sections
+    """
+    for section in FEEDBACK_SECTIONS:
+        setattr(question, f'feedback_{section}', feedback[section])
+    question.feedback_prompt_version = prompt_version
+    question.score = feedback['score']
+    return {section: feedback[section] for section in FEEDBACK_SECTIONS}
+
+def save_feedback(question, feedback):
+    sections = apply_feedback(question, feedback)
+    db.session.commit()
+    return sections
+
+@app.route('/api/submit-feedback', methods=['POST'])
+@login_required
+@role_required('candidate')
+def submit_feedback():
+    question_id = request.json.get('question_id')
+    transcript = request.json.get('transcript')
+    question = Question.query.get_or_404(question_id)
+    
+    try:
+        # Generate feedback using the prebuilt feedback chain
+        feedback_result = generate_feedback(transcript)
+        
+        # Parse the feedback result more robustly
+        feedback = parse_feedback(feedback_result)
+        sections = save_feedback(question, feedback)
+        
+        return jsonify({
+            'status': 'success',
+            'score': feedback['score'],
+            'feedback': sections
+        })
+        
+    except CapacityExceeded:
+        # Ask the client to retry rather than hand out the fallback score
+        raise
+    except Exception as e:
+        logger.error("Error generating feedback: %s", e)
+        # Return a default response in case of error
+        return jsonify({
+            'status': 'success',
+            'score': 7.0,
+            'feedback': FALLBACK_FEEDBACK
+        })
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/submit-feedback/stream', methods=['POST'])
+@login_required
+@role_required('candidate')
+def submit_feedback_stream():
+    question_id = request.json.get('question_id')
+    transcript = request.json.get('transcript')
+    question = Question.query.get_or_404(question_id)
+    return feedback_event_stream(feedback_events(question.id, transcript))
+
+def feedback_events(question_id, transcript):
+    """
+    Generate feedback for a transcript and yield it as server-sent events:
+    'token' for each chunk of LLM output, 'section' as each feedback line
+    completes, then 'done' with the saved feedback (or 'error' when the LLM
+    is at capacity, so the page can fall back to /api/submit-feedback).
+    """
+    parser = FeedbackParser()
+    try:
+        # Forward tokens as they arrive, plus each feedback section as soon as its line is complete
+        for chunk in stream_feedback(transcript):
+            yield sse_event('token', {'text': chunk})
+            for section, value in parser.feed(chunk):
+                yield sse_event('section', {'name': section, 'value': value})
+        for section, value in parser.finish():
+            yield sse_event('section', {'name': section, 'value': value})
+
+        # The stream runs after the view returns, so look the question up in the current session
+        feedback = parser.result()
+        sections = save_feedback(Question.query.get(question_id), feedback)
+        yield sse_event('done', {'score': feedback['score'], 'feedback': sections})
+
+    except CapacityExceeded as e:
+        # No 'done' event, so the page falls back to the regular endpoint after the delay
+        yield sse_event('error', {'message': str(e), 'retry_after': e.retry_after})
+    except Exception as e:
+        logger.error("Error streaming feedback: %s", e)
+        db.session.rollback()
+        yield sse_event('done', {'score': 7.0, 'feedback': FALLBACK_FEEDBACK})
+
+def feedback_event_stream(events):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/complete-test/<int:test_id>', methods=['POST'])
+@login_required
+@role_required('candidate')
+def complete_test(test_id):
+    test = Test.query.get_or_404(test_id)
+    if test.status == 'Completed':
+        # Already completed and queued for evaluation once
+        return jsonify({'status': 'success'})
+    test.status = 'Completed'
+    test.candidate.feedback_status = 'In Progress'
+    db.session.commit()
+
+    # Evaluate and score the answers off the request thread
+    scoring_pool.submit(evaluate_completed_test, test.id)
+    
+    return jsonify({'status': 'success'})
+
+# Admin Routes
+@app.route('/admin')
+@login_required
+@role_required('admin')
+def admin_dashboard():
+    # Create example data if no candidates exist
+    if db.session.query(Candidate.id).first() is None:
+        create_example_data()
+    
+    query = Candidate.query.options(
+        load_only(Candidate.name, Candidate.position, Candidate.score, Candidate.feedback_status)
+    )
+    candidates, next_after = keyset_page(query, Candidate.id)
+    return render_template('admin.html', candidates=candidates, next_after=next_after)
+
+@app.route('/admin/tests')
+@login_required
+@role_required('admin')
+def admin_tests():
+    # The candidate name is shown per row, so join it in instead of one query per test
+    query = Test.query.options(
+        load_only(Test.title, Test.description, Test.status, Test.score, Test.created_at),
+        joinedload(Test.candidate).load_only(Candidate.name)
+    )
+    tests, next_after = keyset_page(query, Test.id)
+    return render_template('admin_tests.html', tests=tests, next_after=next_after)
+
+@app.route('/admin/create-test', methods=['GET', 'POST'])
+@login_required
 @role_required('admin')
 def create_test():
     if request.method == 'POST':
@@ -572,26 +1539,31 @@ def create_test():
         # Create new test
         test = Test(title=title, description=description, candidate_id=candidate_id)
         db.session.add(test)
-        db.session.commit()
+        db.session.flush()  # Assigns test.id without a separate commit
         
-        # Generate questions for the test
+        # Insert the test's questions in one batch
         questions = request.form.getlist('questions')
         contexts = request.form.getlist('contexts')
         
-        for i, (question_text, context) in enumerate(zip(questions, contexts)):
-            question = Question(
-                test_id=test.id,
-                text=question_text,
-                context=context,
-                order=i+1
-            )
-            db.session.add(question)
+        rows = [{
+            'test_id': test.id,
+            'text': question_text,
+            'context': context,
+            'order': i + 1
+        } for i, (question_text, context) in enumerate(zip(questions, contexts))]
+        if rows:
+            db.session.execute(insert(Question), rows)
         
         db.session.commit()
+
+        # Synthesize the question audio now so candidates never wait on gTTS
+        tts_pool.submit(tts_cache.pregenerate, list(questions))
+        queue_qa_encodings(rows)
+
         flash('Test created successfully!', 'success')
         return redirect(url_for('admin_tests'))
     
-    candidates = Candidate.query.all()
+    candidates = Candidate.query.options(load_only(Candidate.name, Candidate.position)).all()
     return render_template('admin_create_test.html', candidates=candidates)
 
 @app.route('/api/generate-questions', methods=['POST'])
@@ -603,19 +1575,109 @@ def generate_questions():
         data = request.get_json()
         position = data.get('position', 'Software Engineer')  # Default to Software Engineer if not specified
         
-        # Generate questions and context using LLM
-        qa_pairs = generate_questions_with_llm(position)
+        # Serve from the question bank, generating with the LLM only when it's short
+        qa_pairs, source = get_questions_for_position(
+            position,
+            num_questions=int(data.get('num_questions', 5)),
+            refresh=bool(data.get('refresh', False))
+        )
         
         return jsonify({
             'status': 'success',
-            'questions': qa_pairs
+            'questions': qa_pairs,
+            'source': source
         })
+    except CapacityExceeded:
+        raise
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': f'Failed to generate questions: {str(e)}'
         }), 500
 
+@app.route('/api/tests/bulk', methods=['POST'])
+@login_required
+@role_required('admin')
+def bulk_create_tests():
+    """
+    Create a test for each of many candidates in one request.
+
+    Questions come from the question bank for each candidate's position (or
+    `position` if given); positions without enough banked questions are
+    generated concurrently. Tests and questions are written with bulk inserts.
+    """
+    data = request.get_json(silent=True) or {}
+    candidate_ids = data.get('candidate_ids') or []
+    if not candidate_ids:
+        return jsonify({'status': 'error', 'message': 'No candidates provided'}), 400
+    try:
+        if not isinstance(candidate_ids, list):
+            raise ValueError
+        # IDs may arrive as strings; compare them with the database's integers
+        candidate_ids = [int(candidate_id) for candidate_id in candidate_ids]
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'candidate_ids must be a list of integers'}), 400
+    try:
+        num_questions = int(data.get('num_questions', 5))
+    except (TypeError, ValueError):
+        num_questions = 0
+    if not 1 <= num_questions <= 20:
+        return jsonify({'status': 'error', 'message': 'num_questions must be an integer from 1 to 20'}), 400
+
+    candidates = Candidate.query.filter(Candidate.id.in_(candidate_ids)).options(
+        load_only(Candidate.name, Candidate.position)
+    ).all()
+    position_of = {candidate.id: data.get('position') or candidate.position for candidate in candidates}
+
+    results, errors = get_questions_for_positions(
+        position_of.values(), num_questions=num_questions, refresh=bool(data.get('refresh', False))
+    )
+
+    created = []
+    for candidate in candidates:
+        position = position_of[candidate.id]
+        if normalize_position(position) not in results:
+            continue
+        test = Test(
+            title=data.get('title') or f"{position} Interview",
+            description=data.get('description', ''),
+            candidate_id=candidate.id
+        )
+        created.append((candidate, position, test))
+
+    db.session.add_all([test for _, _, test in created])
+    db.session.flush()  # Assigns the test ids for the question rows
+
+    rows = []
+    for _, position, test in created:
+        qa_pairs, _ = results[normalize_position(position)]
+        rows.extend({
+            'test_id': test.id,
+            'text': pair['question'],
+            'context': pair.get('context'),
+            'order': i
+        } for i, pair in enumerate(qa_pairs, 1))
+    if rows:
+        db.session.execute(insert(Question), rows)
+    db.session.commit()
+
+    # Synthesize the question audio now so candidates never wait on gTTS
+    tts_pool.submit(tts_cache.pregenerate, sorted({row['text'] for row in rows}))
+    queue_qa_encodings(rows)
+
+    return jsonify({
+        'status': 'success' if created else 'error',
+        'tests': [{
+            'test_id': test.id,
+            'candidate_id': candidate.id,
+            'position': position,
+            'questions': len(results[normalize_position(position)][0]),
+            'source': results[normalize_position(position)][1]
+        } for candidate, position, test in created],
+        'missing_candidates': sorted(set(candidate_ids) - set(position_of)),
+        'errors': errors
+    }), 200 if created else 500
+
 @app.route('/api/check-answer', methods=['POST'])
 @login_required
 @role_required('admin')
@@ -631,7 +1693,13 @@ def check_answer():
 @role_required('admin')
 def get_candidate_details(candidate_id):
     candidate = Candidate.query.get_or_404(candidate_id)
-    tests = Test.query.filter_by(candidate_id=candidate_id).all()
+    # Fetch all of the candidate's questions in one extra query, skipping the long contexts
+    tests = Test.query.filter_by(candidate_id=candidate_id).options(
+        load_only(Test.title, Test.status),
+        selectinload(Test.questions).load_only(
+            Question.text, Question.answer, Question.score, Question.feedback, Question.audio_path, *FEEDBACK_COLUMNS
+        )
+    ).all()
     
     # Format candidate data for JSON response
     candidate_data = {
@@ -649,7 +1717,9 @@ def get_candidate_details(candidate_id):
                 'question': q.text,
                 'answer': q.answer,
                 'score': q.score,
-                'feedback': q.feedback
+                'feedback': feedback_sections(q),
+                'admin_feedback': q.feedback,
+                'audio_url': url_for('question_audio', question_id=q.id) if q.audio_path else None
             } for q in test.questions]
         } for test in tests]
     }
@@ -712,31 +1782,14 @@ def generate_questions_with_llm(position, num_questions=5):
     Returns:
         list: List of dictionaries containing questions and their context
     """
-    # Create a prompt template for generating interview questions with context
-    prompt_template = PromptTemplate(
-        input_variables=["position", "num_questions"],
-        template="""You are an expert technical interviewer. Generate {num_questions} interview questions 
-        for a {position} position. For each question, also provide a detailed context/answer that would be 
-        considered a strong response. The questions should be:
-        1. Technical and relevant to the position
-        2. Open-ended to assess problem-solving skills
-        3. Include both theoretical and practical aspects
-        4. Suitable for assessing both technical knowledge and soft skills
-        
-        Format each question and its context as follows:
-        Q: [Question text ending with a question mark]
-        C: [Detailed context/answer that would be considered a strong response]
-        
-        Return the questions and context in this format, with each Q/C pair separated by a blank line.
-        Do not include any additional text or numbering."""
+    # Generate questions and context with the prebuilt question chain
+    result = llm_provider.timed(
+        'question_generation',
+        registry.get('question_chain').run,
+        position=position,
+        num_questions=num_questions
     )
     
-    # Create a chain
-    chain = LLMChain(llm=llm, prompt=prompt_template)
-    
-    # Generate questions and context
-    result = chain.run(position=position, num_questions=num_questions)
-    
     # Parse the result into questions and context pairs
     qa_pairs = []
     current_pair = {}
@@ -758,15 +1811,128 @@ def generate_questions_with_llm(position, num_questions=5):
     
     return qa_pairs
 
+def normalize_position(position):
+    # "Software  Engineer" and "software engineer" share one bank
+    return " ".join((position or "").split()).lower()[:100]
+
+def question_text_hash(question_text):
+    normalized = " ".join(unicodedata.normalize('NFC', question_text or "").split()).lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def questions_from_bank(position, num_questions):
+    rows = SampleQuestion.query.filter_by(position=normalize_position(position)).options(
+        load_only(SampleQuestion.text, SampleQuestion.context)
+    ).order_by(db.func.random()).limit(num_questions).all()
+    return [{'question': row.text, 'context': row.context} for row in rows]
+
+def bank_questions(position, qa_pairs):
+    """
+    Add generated question/context pairs to the question bank, skipping duplicates.
+
+    Args:
+        position (str): The position the questions were generated for
+        qa_pairs (list): Dictionaries with 'question' and 'context'
+
+    Returns:
+        int: Number of questions added
+    """
+    key = normalize_position(position)
+    pairs = {}
+    for pair in qa_pairs:
+        if pair.get('question'):
+            pairs.setdefault(question_text_hash(pair['question']), pair)
+    if not pairs:
+        return 0
+
+    existing = {
+        text_hash for (text_hash,) in db.session.query(SampleQuestion.text_hash).filter(
+            SampleQuestion.position == key, SampleQuestion.text_hash.in_(list(pairs))
+        )
+    }
+    new_rows = [
+        SampleQuestion(text=pair['question'][:500], context=pair.get('context'), position=key, text_hash=text_hash)
+        for text_hash, pair in pairs.items() if text_hash not in existing
+    ]
+    db.session.add_all(new_rows)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request banked some of the same questions first; retry without them
+        db.session.rollback()
+        return bank_questions(position, qa_pairs)
+    return len(new_rows)
+
+def get_questions_for_positions(positions, num_questions=5, refresh=False):
+    """
+    Get questions for several positions, from the bank where it has enough and
+    otherwise from the LLM. LLM calls run concurrently on `question_pool` and
+    their results are added to the bank.
+
+    Args:
+        positions (iterable): Position names; duplicates are looked up once
+        num_questions (int): Questions wanted per position
+        refresh (bool): Always generate new questions instead of using the bank
+
+    Returns:
+        tuple: ({normalized position: (qa_pairs, 'bank' or 'generated')},
+                {normalized position: error message})
+    """
+    results, pending, errors = {}, {}, {}
+    for position in positions:
+        key = normalize_position(position)
+        if key in results or key in pending:
+            continue
+        qa_pairs = [] if refresh else questions_from_bank(position, num_questions)
+        if len(qa_pairs) >= num_questions:
+            results[key] = (qa_pairs, 'bank')
+        else:
+            pending[key] = (position, question_pool.submit(generate_questions_with_llm, position, num_questions))
+
+    for key, (position, future) in pending.items():
+        try:
+            qa_pairs = future.result()
+        except CapacityExceeded:
+            raise
+        except Exception as e:
+            errors[key] = str(e)
+            continue
+        # Drop pairs the LLM left incomplete, such as a C: line without its Q: line
+        qa_pairs = [pair for pair in qa_pairs if pair.get('question') and pair.get('context')]
+        if not qa_pairs:
+            errors[key] = "The LLM returned no complete question/context pairs"
+            continue
+        bank_questions(position, qa_pairs)
+        results[key] = (qa_pairs, 'generated')
+    return results, errors
+
+def get_questions_for_position(position, num_questions=5, refresh=False):
+    """
+    Returns:
+        tuple: (qa_pairs, 'bank' or 'generated')
+    """
+    results, errors = get_questions_for_positions([position], num_questions, refresh)
+    key = normalize_position(position)
+    if key in errors:
+        raise RuntimeError(errors[key])
+    return results[key]
+
 @app.route('/api/question/<int:question_id>', methods=['DELETE'])
 @login_required
 @role_required('admin')
 def delete_question(question_id):
     try:
         question = Question.query.get_or_404(question_id)
+        test = question.test
         
-        # Delete the question from the database
+        # Delete the question from the database, after the transcription jobs that reference it
+        TranscriptionJob.query.filter_by(question_id=question_id).delete(synchronize_session=False)
         db.session.delete(question)
+        db.session.flush()
+
+        # Re-score a scored test without the question
+        if test.auto_scored_at is not None:
+            db.session.expire(test, ['questions'])
+            rollup_test_score(test)
         db.session.commit()
         
         return jsonify({
@@ -774,11 +1940,34 @@ def delete_question(question_id):
             'message': 'Question deleted successfully'
         })
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'status': 'error',
             'message': f'Failed to delete question: {str(e)}'
         }), 500
 
+@app.route('/api/question/<int:question_id>/audio')
+@login_required
+@role_required('admin')
+def question_audio(question_id):
+    question = Question.query.get_or_404(question_id)
+    if not question.audio_path:
+        return jsonify({'status': 'error', 'message': 'No audio recorded for this question'}), 404
+
+    try:
+        audio_path = audio_store.path(question.audio_path)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid audio path'}), 404
+    if not os.path.exists(audio_path):
+        return jsonify({'status': 'error', 'message': 'Audio file not found'}), 404
+
+    # conditional=True lets the browser seek with HTTP Range requests
+    return send_file(
+        audio_path,
+        mimetype=audio_mimetype(audio_path),
+        conditional=True
+    )
+
 @app.route('/admin/evaluate-test/<int:test_id>')
 @login_required
 @role_required('admin')
@@ -805,14 +1994,311 @@ def evaluate_question(question_id):
         return jsonify({
             'status': 'success',
             'model_answer': qa_result['answer'],
+            'auto_score': question.auto_score,
             'score': None  # Score will be set by admin
         })
+    except CapacityExceeded:
+        raise
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': f'Failed to evaluate question: {str(e)}'
         }), 500
 
+@app.route('/api/evaluate-test/<int:test_id>', methods=['POST'])
+@login_required
+@role_required('admin')
+def evaluate_all_questions(test_id):
+    Test.query.get_or_404(test_id)
+
+    try:
+        questions = Question.query.filter_by(test_id=test_id).order_by(Question.order).all()
+
+        # Run every question through the QA pipeline as a single batch
+        qa_results = get_answers([(q.text, q.context or "") for q in questions])
+
+        return jsonify({
+            'status': 'success',
+            'results': [{
+                'question_id': q.id,
+                'model_answer': result['answer'],
+                'auto_score': q.auto_score,
+                'score': None  # Score will be set by admin
+            } for q, result in zip(questions, qa_results)]
+        })
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to evaluate test: {str(e)}'
+        }), 500
+
+def qa_token_ids(texts):
+    # Reuse the encodings stored at test creation; tokenize the rest (candidate answers) here
+    encodings = lookup_qa_encodings(texts)
+    missing = [text for text in set(texts) if text not in encodings]
+    if missing:
+        tokenizer = registry.get('qa_tokenizer')
+        encodings.update({text: TextEncoding.from_text(tokenizer, text) for text in missing})
+    return [encodings[text].token_ids for text in texts]
+
+def score_questions(questions):
+    """
+    Give answered questions a provisional score: the QA model answers each
+    question from its context, then all answers are compared with the model's
+    answers and the contexts in one vectorized pass (see scoring.provisional_scores).
+
+    Args:
+        questions (list): Question rows; those without an answer or context are skipped
+
+    Returns:
+        int: Number of questions scored
+    """
+    scorable = [q for q in questions if q.answer and q.answer.strip() and q.context and q.context.strip()]
+    if not scorable:
+        return 0
+
+    # Scoring runs in the background, so it waits for the QA queue rather than being turned away
+    results = get_answers([(q.text, q.context) for q in scorable], block=True)
+    if any(result.get('error') for result in results):
+        raise RuntimeError("The QA model failed to answer some questions")
+    model_answers = [result['answer'] for result in results]
+    answers = [q.answer for q in scorable]
+    contexts = [q.context for q in scorable]
+    try:
+        token_ids = qa_token_ids(answers + contexts)
+        embedding_matrix = registry.get('qa_token_embeddings')
+    except Exception as e:
+        # Score on word overlap alone rather than not at all
+        logger.warning("Embedding similarity unavailable: %s", e)
+        token_ids, embedding_matrix = None, None
+
+    scores = provisional_scores(
+        answers, model_answers, contexts,
+        answer_ids=token_ids[:len(answers)] if token_ids else None,
+        context_ids=token_ids[len(answers):] if token_ids else None,
+        embedding_matrix=embedding_matrix
+    )
+    for question, model_answer, score in zip(scorable, model_answers, scores['score']):
+        question.model_answer = model_answer
+        question.auto_score = float(score)
+    return len(scorable)
+
+def score_completed_tests(limit=100):
+    """
+    Score every completed test that hasn't been scored yet, `limit` tests per batch.
+
+    Returns:
+        tuple: (tests scored, questions scored)
+    """
+    total_tests, total_questions = 0, 0
+    while True:
+        test_ids = db.session.execute(
+            select(Test.id).where(Test.status == 'Completed', Test.auto_scored_at.is_(None))
+            .order_by(Test.id).limit(limit)
+        ).scalars().all()
+        if not test_ids:
+            return total_tests, total_questions
+        claimed = claim_tests_for_scoring(test_ids)
+        if not claimed:
+            continue
+
+        try:
+            tests = Test.query.filter(Test.id.in_(claimed)).options(
+                load_only(Test.candidate_id, Test.score),
+                selectinload(Test.questions).load_only(
+                    Question.text, Question.context, Question.answer, Question.score, Question.auto_score
+                )
+            ).all()
+            total_questions += score_questions([q for test in tests for q in test.questions])
+            for test in tests:
+                rollup_test_score(test)
+            db.session.commit()
+        except Exception:
+            release_tests_for_scoring(claimed)
+            raise
+        refresh_feedback_status({test.candidate_id for test in tests})
+        total_tests += len(tests)
+
+def rollup_test_score(test):
+    """
+    Recompute one test's score from its questions and apply the change to the
+    candidate's running totals in a single atomic UPDATE, so concurrent jobs
+    for the same candidate don't lose each other's updates. Doesn't commit.
+
+    A question counts with its feedback/admin score, or its provisional
+    automatic score when it has none.
+    """
+    scores = [q.score if q.score is not None else q.auto_score for q in test.questions]
+    scores = [score for score in scores if score is not None]
+    new_score = round(sum(scores) / len(scores), 2) if scores else None
+
+    old_score = committed_test_score(test.id)
+    test.score = new_score
+    test.auto_scored_at = datetime.utcnow()
+    adjust_candidate_score(test.candidate_id, old_score, new_score)
+    return new_score
+
+def committed_test_score(test_id):
+    # The delta is taken against the stored score, not a possibly stale copy in the session;
+    # on server databases the row stays locked until the caller commits
+    return db.session.execute(select(Test.score).where(Test.id == test_id).with_for_update()).scalar()
+
+def adjust_candidate_score(candidate_id, old_score, new_score):
+    """
+    Apply a change of one test's score to the candidate's running totals in a
+    single atomic UPDATE. A score of None means the test isn't counted.
+    Doesn't commit.
+    """
+    delta_total = (new_score or 0.0) - (old_score or 0.0)
+    delta_count = (new_score is not None) - (old_score is not None)
+    if delta_total or delta_count:
+        total = func.coalesce(Candidate.score_total, 0.0) + delta_total
+        count = func.coalesce(Candidate.scored_tests, 0) + delta_count
+        db.session.execute(
+            update(Candidate).where(Candidate.id == candidate_id).values(
+                score_total=total,
+                scored_tests=count,
+                score=case((count > 0, total / count), else_=0.0)
+            )
+        )
+
+def claim_tests_for_scoring(test_ids):
+    """
+    Mark completed, unscored tests as taken by this job, one conditional UPDATE
+    each, so a test queued twice or picked up by an overlapping batch is only
+    scored (and counted into the candidate's score) once.
+
+    Returns:
+        list: IDs of the tests this call claimed
+    """
+    claimed = []
+    for test_id in test_ids:
+        result = db.session.execute(
+            update(Test).where(
+                Test.id == test_id, Test.status == 'Completed', Test.auto_scored_at.is_(None)
+            ).values(auto_scored_at=datetime.utcnow()).execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed.append(test_id)
+    db.session.commit()
+    return claimed
+
+def release_tests_for_scoring(test_ids):
+    # Undo a claim after a failure, so the tests are picked up again later
+    db.session.rollback()
+    db.session.execute(
+        update(Test).where(Test.id.in_(list(test_ids))).values(auto_scored_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+def refresh_feedback_status(candidate_ids):
+    # Run after the scores are committed, so whichever job finishes last sees every other job's result
+    unscored = select(Test.id).where(
+        Test.candidate_id == Candidate.id, Test.status == 'Completed', Test.auto_scored_at.is_(None)
+    ).exists()
+    db.session.execute(
+        update(Candidate).where(Candidate.id.in_(list(candidate_ids))).values(
+            feedback_status=case((unscored, 'In Progress'), else_='Completed')
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+def evaluate_completed_test(test_id):
+    """
+    Background job queued when a candidate completes a test: generate feedback
+    for answers that have none, give every answer a provisional score, then
+    update the test's score, the candidate's running score and their
+    feedback status.
+    """
+    if not claim_tests_for_scoring([test_id]):
+        # Not completed, already scored, or being scored by another job
+        return
+    test = Test.query.options(selectinload(Test.questions)).get(test_id)
+
+    try:
+        for question in test.questions:
+            if question.answer and question.answer.strip() and question.score is None:
+                try:
+                    apply_feedback(question, parse_feedback(generate_feedback(question.answer)))
+                except Exception as e:
+                    logger.error("Error generating feedback for question %s: %s", question.id, e)
+
+        try:
+            score_questions(test.questions)
+        except Exception as e:
+            # Feedback scores alone still give the test a score
+            logger.warning("Automatic scoring unavailable for test %s: %s", test_id, e)
+
+        rollup_test_score(test)
+        db.session.commit()
+    except Exception:
+        release_tests_for_scoring([test_id])
+        raise
+    refresh_feedback_status([test.candidate_id])
+
+@app.cli.command('score-tests')
+@click.option('--batch-size', default=100, help='Tests scored per batch')
+def score_tests_command(batch_size):
+    """Give provisional scores to the answers of completed, unscored tests."""
+    tests, questions = score_completed_tests(batch_size)
+    click.echo(f"Scored {questions} answer(s) in {tests} test(s)")
+
+@app.route('/api/score-completed-tests', methods=['POST'])
+@login_required
+@role_required('admin')
+def score_completed_tests_endpoint():
+    try:
+        pending = db.session.scalar(
+            select(func.count(Test.id)).where(Test.status == 'Completed', Test.auto_scored_at.is_(None))
+        )
+        # Scoring makes blocking QA and LLM calls, so it runs on the scoring pool, not the request
+        if pending:
+            scoring_pool.submit(score_completed_tests)
+        return jsonify({
+            'status': 'success',
+            'message': 'Scoring queued' if pending else 'No tests to score',
+            'tests_pending': pending
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to queue scoring: {str(e)}'
+        }), 500
+
+@app.route('/api/qa-cache/stats')
+@login_required
+@role_required('admin')
+def qa_cache_statistics():
+    with qa_cache_stats_lock:
+        hits, misses = qa_cache_stats['hits'], qa_cache_stats['misses']
+
+    return jsonify({
+        'status': 'success',
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        'entries': QAAnswerCache.query.count(),
+        'max_entries': app.config['QA_CACHE_MAX_ENTRIES'],
+        'inference': qa_batcher.stats()
+    })
+
+@app.route('/api/llm/stats')
+@login_required
+@role_required('admin')
+def llm_statistics():
+    return jsonify({
+        'status': 'success',
+        'calls': llm_provider.stats.snapshot(),
+        'feedback_cache': feedback_cache.stats(),
+        'limiters': {
+            'openai': llm_provider.limiter.stats(),
+            'tts': tts_cache.limiter.stats()
+        }
+    })
+
 @app.route('/api/update-question-score/<int:question_id>', methods=['POST'])
 @login_required
 @role_required('admin')
@@ -824,6 +2310,10 @@ def update_question_score(question_id):
         # Update the question with admin-provided score
         question.score = float(data.get('score', 0))
         question.feedback = data.get('feedback', '')
+
+        # Keep the test and candidate aggregates in step once the test has been scored
+        if question.test.auto_scored_at is not None:
+            rollup_test_score(question.test)
         db.session.commit()
         
         return jsonify({
@@ -836,31 +2326,81 @@ def update_question_score(question_id):
             'message': f'Failed to update score: {str(e)}'
         }), 500
 
+@app.route('/healthz/warm', methods=['GET'])
+def warm_models_status():
+    # Public, like /healthz: only reports what is loaded
+    return jsonify({
+        'status': 'success',
+        'models': registry.stats()
+    })
+
+@app.route('/healthz/warm', methods=['POST'])
+def warm_models():
+    # Loading runs every registered loader (and retries failed ones), so it is limited to
+    # admins and to deploy hooks that send the WARM_TOKEN
+    token = app.config['WARM_TOKEN']
+    authorized = session.get('role') == 'admin' or (
+        token and hmac.compare_digest(request.headers.get('X-Warm-Token', ''), token)
+    )
+    if not authorized:
+        return jsonify({'status': 'error', 'message': 'Admin login or warm token required'}), 403
+
+    models = registry.warm()
+    ok = all(m['loaded'] for m in models.values())
+    return jsonify({
+        'status': 'success' if ok else 'error',
+        'models': models
+    }), 200 if ok else 503
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Unauthenticated like /healthz, for the Prometheus scraper; keep it off the public network
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/text-to-speech')
+@login_required
 def text_to_speech():
     text = request.args.get('text', '')
+    lang = request.args.get('lang', 'en')
     if not text:
         return "No text provided", 400
-    
-    # Create gTTS object
-    tts = gTTS(text=text, lang='en', slow=False)
-    
-    # Save to BytesIO object
-    audio_file = BytesIO()
-    tts.write_to_fp(audio_file)
-    audio_file.seek(0)
-    
-    return send_file(
-        audio_file,
+
+    # The cache key is a hash of the text, so a matching ETag means the browser already has it
+    etag = TTSCache.key(text, lang)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        # Behind a login, so only the browser may keep it, not shared proxies
+        response.cache_control.private = True
+        response.cache_control.max_age = app.config['TTS_MAX_AGE']
+        return response
+
+    try:
+        etag, audio = tts_cache.get(text, lang)
+    except CapacityExceeded:
+        raise
+    except Exception as e:
+        logger.error("Error in text_to_speech: %s", e)
+        return "Text-to-speech is unavailable", 503
+
+    response = send_file(
+        BytesIO(audio),
         mimetype='audio/mpeg',
         as_attachment=False,
-        download_name='question.mp3'
+        download_name='question.mp3',
+        etag=etag,
+        max_age=app.config['TTS_MAX_AGE'],
+        conditional=True
     )
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
         create_default_admin()  # Ensure the default admin is created
+        fail_stale_transcription_jobs()
         # populate_sample_questions()  # Populate sample questions
 
     app.run(debug=True) 
\ No newline at end of file
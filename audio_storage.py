@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+
+# Extensions by upload mimetype, so the transcriber can tell the container format
+AUDIO_EXTENSIONS = {
+    'audio/wav': '.wav',
+    'audio/x-wav': '.wav',
+    'audio/wave': '.wav',
+    'audio/webm': '.webm',
+    'audio/ogg': '.ogg',
+    'audio/mpeg': '.mp3',
+}
+
+AUDIO_MIMETYPES = {ext: mimetype for mimetype, ext in reversed(list(AUDIO_EXTENSIONS.items()))}
+
+
+class AudioStore:
+    """
+    Content-addressed storage for recorded answers.
+
+    Recordings live at `<root>/<question_id>/<sha256><ext>`, so every question
+    keeps its own audio, concurrent uploads never share a path and re-uploading
+    identical audio is a no-op. Paths handed out are relative to the root.
+    """
+
+    def __init__(self, root, chunk_size=64 * 1024):
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size
+
+    def save_stream(self, stream, question_id, extension='.webm'):
+        """
+        Stream an upload to disk in chunks, hashing it on the way.
+
+        Args:
+            stream: Binary file-like object to read from
+            question_id (int): Question the recording answers
+            extension (str): File extension including the dot
+
+        Returns:
+            str: Path of the stored recording, relative to the store root
+        """
+        directory = os.path.join(self.root, str(question_id))
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+            relative_path = os.path.join(str(question_id), digest.hexdigest() + extension)
+            os.replace(temp_path, os.path.join(self.root, relative_path))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return relative_path
+
+    def save_bytes(self, data, question_id, extension='.webm'):
+        relative_path = os.path.join(str(question_id), hashlib.sha256(data).hexdigest() + extension)
+        full_path = os.path.join(self.root, relative_path)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), suffix='.part')
+            with os.fdopen(fd, 'wb') as out:
+                out.write(data)
+            os.replace(temp_path, full_path)
+        return relative_path
+
+    def path(self, relative_path):
+        # Refuse anything that would resolve outside the store
+        full_path = os.path.abspath(os.path.join(self.root, relative_path))
+        if os.path.commonpath([self.root, full_path]) != self.root:
+            raise ValueError(f"Audio path '{relative_path}' is outside the audio store")
+        return full_path
+
+    def open(self, relative_path):
+        return open(self.path(relative_path), 'rb')
+
+
+def audio_extension(mimetype):
+    return AUDIO_EXTENSIONS.get((mimetype or '').split(';')[0].strip().lower(), '.webm')
+
+
+def audio_mimetype(path):
+    return AUDIO_MIMETYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream')
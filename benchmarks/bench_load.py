@@ -0,0 +1,208 @@
+"""
+Offline load test of the candidate and admin endpoints.
+
+Starts a fake OpenAI server (completions and Whisper transcriptions with
+configurable latency), replaces the QA model with a fake pipeline and uses
+the fake TTS backend, so no API keys, credits or model files are needed.
+Seeds a throwaway SQLite database, then drives the real endpoints through
+the Flask test client:
+
+- simulated candidates (one per thread) log in, fetch question audio from
+  /text-to-speech, upload an answer to /api/record-answer, poll its
+  transcription job and post the transcript to /api/submit-feedback;
+- simulated admins look up candidates with /api/candidate/<id> and run
+  /api/evaluate-question/<id> until the candidates are done.
+
+Reports p50/p95/p99 latency and requests/sec per endpoint, plus the time
+from upload to finished transcription.
+
+Usage:
+    python benchmarks/bench_load.py [--candidates 2000] [--concurrency 16] [--sessions 200]
+        [--admins 2] [--llm-latency-ms 800] [--whisper-latency-ms 400] [--qa-latency-ms 30]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_queries import seed
+from bench_storage import seed_users
+from fakes import FakeOpenAIServer, FakeQAPipeline
+
+TESTS_PER_CANDIDATE, QUESTIONS_PER_TEST = 2, 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=2000, help='seeded candidates')
+    parser.add_argument('--concurrency', type=int, default=16, help='simultaneous candidates')
+    parser.add_argument('--sessions', type=int, default=200, help='candidate sessions to run')
+    parser.add_argument('--questions', type=int, default=2, help='questions answered per session')
+    parser.add_argument('--admins', type=int, default=2, help='simultaneous admins')
+    parser.add_argument('--llm-latency-ms', type=float, default=800)
+    parser.add_argument('--whisper-latency-ms', type=float, default=400)
+    parser.add_argument('--qa-latency-ms', type=float, default=30)
+    parser.add_argument('--audio-kb', type=int, default=64, help='size of each uploaded answer')
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+class Recorder:
+    """Collects latencies per endpoint from many threads."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, name, ms, ok=True):
+        with self._lock:
+            self.timings[name].append(ms)
+            if not ok:
+                self.errors[name] += 1
+
+    def request(self, client, name, method, url, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        self.add(name, (time.perf_counter() - start) * 1000, response.status_code in expected)
+        return response
+
+    def report(self, elapsed):
+        print(f"{'endpoint':<34}{'requests':>9}{'errors':>8}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, values in self.timings.items():
+            values = sorted(values)
+            pick = lambda q: values[min(len(values) - 1, int(len(values) * q))]
+            print(f"{name:<34}{len(values):>9}{self.errors[name]:>8}{len(values) / elapsed:>8.1f}"
+                  f"{pick(0.5):>10.1f}{pick(0.95):>10.1f}{pick(0.99):>10.1f}")
+
+
+def login(recorder, client, username):
+    recorder.request(client, 'POST /login', 'post', '/login',
+                     data={'username': username, 'password': 'secret'}, expected=(302,))
+
+
+def candidate_session(recorder, client, candidate_id, args, audio):
+    login(recorder, client, f'candidate{candidate_id}')
+    test_id = (candidate_id - 1) * TESTS_PER_CANDIDATE + 1
+    first_question_id = (test_id - 1) * QUESTIONS_PER_TEST + 1
+
+    for question_id in range(first_question_id, first_question_id + min(args.questions, QUESTIONS_PER_TEST)):
+        recorder.request(client, 'GET /text-to-speech', 'get', '/text-to-speech',
+                         query_string={'text': f'Question {question_id - first_question_id + 1} of test {test_id}?'})
+
+        uploaded = time.perf_counter()
+        response = recorder.request(client, 'POST /api/record-answer', 'post', '/api/record-answer', data={
+            'question_id': str(question_id),
+            'audio': (audio(), 'answer.webm', 'audio/webm')
+        }, content_type='multipart/form-data', expected=(202,))
+        if response.status_code != 202:
+            continue
+
+        # Poll the job like the candidate page does
+        job_id, job = response.get_json()['job_id'], {}
+        while job.get('status') not in ('Completed', 'Failed'):
+            time.sleep(0.05)
+            response = recorder.request(client, 'GET /api/transcription-job/<id>', 'get',
+                                        f'/api/transcription-job/{job_id}')
+            job = response.get_json()['job']
+        recorder.add('transcription job (upload to done)', (time.perf_counter() - uploaded) * 1000,
+                     job['status'] == 'Completed')
+        if job['status'] != 'Completed':
+            continue
+
+        recorder.request(client, 'POST /api/submit-feedback', 'post', '/api/submit-feedback',
+                         json={'question_id': question_id, 'transcript': job['transcript']})
+
+
+def admin_session(recorder, client, args, done):
+    login(recorder, client, 'admin')
+    while not done.is_set():
+        candidate_id = random.randint(1, args.candidates)
+        recorder.request(client, 'GET /api/candidate/<id>', 'get', f'/api/candidate/{candidate_id}')
+        question_id = random.randint(1, args.candidates * TESTS_PER_CANDIDATE * QUESTIONS_PER_TEST)
+        recorder.request(client, 'POST /api/evaluate-question/<id>', 'post', f'/api/evaluate-question/{question_id}')
+
+
+def run(app_module, args):
+    recorder = Recorder()
+    random.seed(0)
+    work = [random.randint(1, args.candidates) for _ in range(args.sessions)]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def audio():
+        from io import BytesIO
+        return BytesIO(os.urandom(args.audio_kb * 1024))
+
+    def candidate_worker():
+        client = app_module.app.test_client()
+        while True:
+            with lock:
+                if not work:
+                    return
+                candidate_id = work.pop()
+            candidate_session(recorder, client, candidate_id, args, audio)
+
+    def admin_worker():
+        admin_session(recorder, app_module.app.test_client(), args, done)
+
+    candidates = [threading.Thread(target=candidate_worker) for _ in range(args.concurrency)]
+    admins = [threading.Thread(target=admin_worker) for _ in range(args.admins)]
+    start = time.perf_counter()
+    for thread in candidates + admins:
+        thread.start()
+    for thread in candidates:
+        thread.join()
+    done.set()
+    for thread in admins:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='interview-load-')
+    database = args.database or os.path.join(workdir, 'bench.db')
+
+    server = FakeOpenAIServer(llm_latency_ms=args.llm_latency_ms, whisper_latency_ms=args.whisper_latency_ms).start()
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{os.path.abspath(database)}',
+        'OPENAI_BASE_URL': server.base_url,
+        'OPENAI_API_KEY': 'sk-fake',
+        'TRANSCRIPTION_BACKEND': 'openai',
+        'TTS_BACKEND': 'fake',
+        'AUDIO_STORAGE_DIR': os.path.join(workdir, 'audio'),
+        'TTS_CACHE_DIR': os.path.join(workdir, 'tts'),
+        'QA_PRECOMPUTED_ENCODINGS': '0',
+        'LOG_LEVEL': os.getenv('LOG_LEVEL', 'WARNING')
+    })
+
+    import app as app_module
+    app_module.registry.register('qa_pipeline', lambda: FakeQAPipeline(latency_ms=args.qa_latency_ms))
+
+    with app_module.app.app_context():
+        seed(app_module, args.candidates, TESTS_PER_CANDIDATE, QUESTIONS_PER_TEST)
+        app_module.upgrade_schema()
+        seed_users(app_module, args.candidates)
+        app_module.db.session.add(app_module.User(username='admin', password='secret', role='admin'))
+        app_module.db.session.commit()
+
+    print(f"{args.sessions} candidate sessions ({args.concurrency} concurrent, {args.questions} answers each), "
+          f"{args.admins} admins; fake LLM {args.llm_latency_ms:.0f} ms, Whisper {args.whisper_latency_ms:.0f} ms, "
+          f"QA {args.qa_latency_ms:.0f} ms")
+    recorder, elapsed = run(app_module, args)
+    requests = sum(len(values) for name, values in recorder.timings.items() if name.startswith(('GET', 'POST')))
+    recorder.report(elapsed)
+    print(f"{requests} requests in {elapsed:.1f}s = {requests / elapsed:.0f} req/s "
+          f"({server.calls['completions']} completions, {server.calls['transcriptions']} transcriptions served)")
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Latency, throughput, memory and accuracy-parity benchmark for the QA runtimes.
+
+Each runtime (see `qa_runtime.QA_RUNTIMES`) is loaded in its own process from
+./model so peak RSS is measured in isolation. Every process answers the same
+interview-style (question, context) pairs one at a time (latency) and in
+batches (throughput); answers are then compared with the full-precision
+'torch' runtime.
+
+Usage:
+    python benchmarks/bench_qa_runtime.py [--runtimes torch,quantized,onnx,onnx-int8] [--repeat 5] [--batch-size 16]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from qa_runtime import QA_RUNTIMES, compare_answers
+
+CONTEXTS = [
+    "Object-oriented programming organises code into objects that bundle data and behaviour. "
+    "Its main principles are encapsulation, which hides internal state behind methods, inheritance, "
+    "which lets a class reuse and extend another class, polymorphism, which lets different classes be "
+    "used through one interface, and abstraction, which exposes only the essential features of an object.",
+    "Git is a distributed version control system. Developers commit changes locally, create branches "
+    "for features, and merge them back through pull requests after code review. Rebasing rewrites "
+    "history to keep it linear, while merging preserves the branch structure.",
+    "When code causes performance issues, start by measuring: profile the application to find the hot "
+    "spots, check database queries for missing indexes or N+1 patterns, and add caching where results "
+    "are reused. Only optimise after the bottleneck is confirmed, and verify the gain with a benchmark.",
+    "REST is an architectural style that uses HTTP methods on resources and usually exchanges JSON. "
+    "SOAP is a protocol that exchanges XML envelopes described by a WSDL contract and supports "
+    "standards such as WS-Security. REST is lighter weight, while SOAP offers stricter contracts.",
+]
+QUESTIONS = [
+    "What are the main principles of object-oriented programming?",
+    "What does encapsulation hide?",
+    "How are feature branches merged back?",
+    "What does rebasing do to history?",
+    "What should you do first when code is slow?",
+    "What database problems should you check for?",
+    "What format does SOAP exchange?",
+    "Which is lighter weight, REST or SOAP?",
+]
+PAIRS = [(question, CONTEXTS[i // 2]) for i, question in enumerate(QUESTIONS)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runtimes', default=','.join(QA_RUNTIMES))
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the sample pairs')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--threads', type=int, help='inference threads (default: library default)')
+    parser.add_argument('--model', default=os.path.join(ROOT, 'model'))
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_worker(args):
+    from transformers import AutoTokenizer
+    from qa_runtime import load_qa_runtime
+
+    start = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(args.model, local_files_only=True)
+    qa_pipeline = load_qa_runtime(args.model, tokenizer, runtime=args.worker, cache_dir=args.cache_dir,
+                                  revision='bench', threads=args.threads)
+    qa_pipeline(question=PAIRS[0][0], context=PAIRS[0][1])  # Warm-up
+    load_seconds = time.perf_counter() - start
+
+    latencies, answers = [], []
+    for _ in range(args.repeat):
+        for question, context in PAIRS:
+            start = time.perf_counter()
+            answers.append(qa_pipeline(question=question, context=context))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    batch = (PAIRS * (args.batch_size // len(PAIRS) + 1))[:args.batch_size]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        qa_pipeline(question=[q for q, _ in batch], context=[c for _, c in batch], batch_size=len(batch))
+    throughput = args.repeat * len(batch) / (time.perf_counter() - start)
+
+    latencies.sort()
+    print(json.dumps({
+        'load_seconds': load_seconds,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'throughput': throughput,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'answers': [{'answer': a['answer'], 'score': float(a['score'])} for a in answers[:len(PAIRS)]]
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        run_worker(args)
+        return
+
+    cache_dir = tempfile.mkdtemp(prefix='qa-onnx-')
+    runtimes = [runtime.strip() for runtime in args.runtimes.split(',') if runtime.strip()]
+    if 'torch' not in runtimes:
+        runtimes.insert(0, 'torch')  # The parity reference
+
+    results = {}
+    for runtime in runtimes:
+        command = [sys.executable, os.path.abspath(__file__), '--worker', runtime, '--cache-dir', cache_dir,
+                   '--repeat', str(args.repeat), '--batch-size', str(args.batch_size), '--model', args.model]
+        if args.threads:
+            command += ['--threads', str(args.threads)]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"{runtime}: failed\n{output.stderr.strip().splitlines()[-1] if output.stderr.strip() else ''}")
+            continue
+        results[runtime] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    reference = results.get('torch')
+    print(f"{'runtime':<12}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'pairs/s':>9}{'RSS MB':>9}{'exact':>8}{'F1':>7}{'max dscore':>12}")
+    for runtime, result in results.items():
+        parity = compare_answers(reference['answers'], result['answers']) if reference else None
+        print(f"{runtime:<12}{result['load_seconds']:>8.1f}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+              f"{result['throughput']:>9.1f}{result['rss_mb']:>9.0f}"
+              + (f"{parity['exact_match']:>8.2f}{parity['token_f1']:>7.2f}{parity['max_score_diff']:>12.3f}"
+                 if parity else ''))
+
+
+if __name__ == '__main__':
+    main()
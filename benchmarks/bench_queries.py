@@ -0,0 +1,161 @@
+"""
+Query-count and latency benchmark for the admin read paths.
+
+Seeds a throwaway SQLite database (10k candidates, 20k tests, 100k questions by
+default), then drives the real endpoints and copies of their previous,
+lazy-loading implementations through the Flask test client, reporting queries
+issued and latency per request.
+
+Usage:
+    python benchmarks/bench_queries.py [--candidates 10000] [--questions-per-test 5] [--samples 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--tests-per-candidate', type=int, default=2)
+    parser.add_argument('--questions-per-test', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def seed(app_module, candidates, tests_per_candidate, questions_per_test):
+    from sqlalchemy import insert
+    db = app_module.db
+    context = "A strong answer explains the trade-offs involved and gives a concrete example. " * 8
+
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(app_module.Candidate), [
+        {'id': i, 'name': f'candidate{i}', 'position': 'Software Engineer', 'score': 0.0, 'feedback_status': 'Pending'}
+        for i in range(1, candidates + 1)
+    ])
+    test_rows, question_rows = [], []
+    for candidate_id in range(1, candidates + 1):
+        for _ in range(tests_per_candidate):
+            test_id = len(test_rows) + 1
+            test_rows.append({'id': test_id, 'title': f'Test {test_id}', 'description': 'Benchmark test',
+                              'candidate_id': candidate_id, 'status': 'Completed'})
+            for order in range(1, questions_per_test + 1):
+                question_rows.append({'test_id': test_id, 'text': f'Question {order} of test {test_id}?',
+                                      'context': context, 'order': order, 'answer': 'An answer.',
+                                      'score': 7.0, 'feedback': '<p>Feedback</p>'})
+    db.session.execute(insert(app_module.Test), test_rows)
+    db.session.execute(insert(app_module.Question), question_rows)
+    db.session.commit()
+    return len(test_rows), len(question_rows)
+
+
+def register_legacy_views(app_module):
+    """Copies of the read paths as they were before eager loading and pagination."""
+    from flask import jsonify, render_template
+    app, Candidate, Test = app_module.app, app_module.Candidate, app_module.Test
+
+    def legacy_candidate_details(candidate_id):
+        candidate = Candidate.query.get_or_404(candidate_id)
+        tests = Test.query.filter_by(candidate_id=candidate_id).all()
+        return jsonify({'status': 'success', 'candidate': {
+            'id': candidate.id, 'name': candidate.name, 'position': candidate.position,
+            'score': candidate.score, 'feedback_status': candidate.feedback_status,
+            'tests': [{'id': test.id, 'title': test.title, 'status': test.status, 'questions': [{
+                'id': q.id, 'question': q.text, 'answer': q.answer, 'score': q.score, 'feedback': q.feedback
+            } for q in test.questions]} for test in tests]
+        }})
+
+    def legacy_admin_dashboard():
+        if Candidate.query.count() == 0:
+            pass
+        return render_template('admin.html', candidates=Candidate.query.all())
+
+    def legacy_admin_tests():
+        return render_template('admin_tests.html', tests=Test.query.all())
+
+    app.add_url_rule('/bench/legacy/candidate/<int:candidate_id>', view_func=legacy_candidate_details)
+    app.add_url_rule('/bench/legacy/admin', view_func=legacy_admin_dashboard)
+    app.add_url_rule('/bench/legacy/admin/tests', view_func=legacy_admin_tests)
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(client, counter, urls):
+    latencies, queries = [], []
+    for url in urls:
+        before = counter.count
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count - before)
+        assert response.status_code == 200, f"{url} returned {response.status_code}"
+    latencies.sort()
+    return {
+        'requests': len(urls),
+        'queries_per_request': statistics.mean(queries),
+        'p50_ms': latencies[len(latencies) // 2],
+        'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main():
+    args = parse_args()
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='interview-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(database)}'
+
+    import app as app_module
+    register_legacy_views(app_module)
+
+    with app_module.app.app_context():
+        start = time.perf_counter()
+        tests, questions = seed(app_module, args.candidates, args.tests_per_candidate, args.questions_per_test)
+        print(f"Seeded {args.candidates} candidates, {tests} tests, {questions} questions "
+              f"in {time.perf_counter() - start:.1f}s ({database})")
+        counter = QueryCounter(app_module.db.engine)
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session['user'] = 'admin'
+        session['role'] = 'admin'
+
+    random.seed(0)
+    candidate_ids = [random.randint(1, args.candidates) for _ in range(args.samples)]
+    last_page = max(1, args.candidates - app_module.app.config['ADMIN_PAGE_SIZE'])
+    list_samples = max(1, args.samples // 20)
+
+    scenarios = [
+        ('candidate details (legacy)', [f'/bench/legacy/candidate/{i}' for i in candidate_ids]),
+        ('candidate details', [f'/api/candidate/{i}' for i in candidate_ids]),
+        ('admin dashboard (legacy, all rows)', ['/bench/legacy/admin'] * list_samples),
+        ('admin dashboard, first page', ['/admin'] * list_samples),
+        ('admin dashboard, last page', [f'/admin?after={last_page}'] * list_samples),
+        ('admin tests (legacy, all rows)', ['/bench/legacy/admin/tests'] * list_samples),
+        ('admin tests, first page', ['/admin/tests'] * list_samples),
+    ]
+
+    print(f"\n{'scenario':<38}{'requests':>9}{'queries/req':>13}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, urls in scenarios:
+        result = measure(client, counter, urls)
+        print(f"{name:<38}{result['requests']:>9}{result['queries_per_request']:>13.1f}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
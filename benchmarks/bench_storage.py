@@ -0,0 +1,141 @@
+"""
+Concurrent-candidate load benchmark for the storage profile.
+
+Seeds a throwaway SQLite database, then runs the same candidate workload
+(login, home page, test page, each question page, complete test) from many
+threads twice: once without the schema indexes and with SQLite's default
+rollback journal, and once with the indexes from `upgrade_schema()` and the
+WAL storage profile. Reports per-step latency and overall throughput.
+
+Usage:
+    python benchmarks/bench_storage.py [--candidates 10000] [--concurrency 16] [--sessions 400]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_queries import seed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16, help='simultaneous candidates')
+    parser.add_argument('--sessions', type=int, default=400, help='candidate sessions per profile')
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def seed_users(app_module, candidates):
+    from sqlalchemy import insert
+    app_module.db.session.execute(insert(app_module.User), [
+        {'username': f'candidate{i}', 'password': 'secret', 'role': 'candidate'}
+        for i in range(1, candidates + 1)
+    ])
+    app_module.db.session.commit()
+
+
+def use_baseline_profile(app_module):
+    from sqlalchemy import text
+    db = app_module.db
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                db.session.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+    db.session.execute(text('PRAGMA journal_mode=DELETE'))
+    db.session.commit()
+    app_module.app.config['SQLITE_WAL'] = False
+    db.engine.dispose()
+
+
+def use_optimized_profile(app_module):
+    app_module.app.config['SQLITE_WAL'] = True
+    app_module.db.engine.dispose()
+    app_module.upgrade_schema()
+
+
+def candidate_session(client, candidate_id, tests_per_candidate, questions_per_test, timings):
+    def step(name, method, url, **kwargs):
+        start = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        timings[name].append((time.perf_counter() - start) * 1000)
+        assert response.status_code in (200, 302), f"{url} returned {response.status_code}"
+
+    test_id = (candidate_id - 1) * tests_per_candidate + 1
+    first_question_id = (test_id - 1) * questions_per_test + 1
+
+    step('login', 'post', '/login', data={'username': f'candidate{candidate_id}', 'password': 'secret'})
+    step('candidate home', 'get', '/candidate')
+    step('test page', 'get', f'/candidate/test/{test_id}')
+    for question_id in range(first_question_id, first_question_id + questions_per_test):
+        step('question page', 'get', f'/candidate/question/{question_id}')
+    step('complete test', 'post', f'/api/complete-test/{test_id}')
+
+
+def run_profile(app_module, args, tests_per_candidate, questions_per_test):
+    timings = defaultdict(list)
+    random.seed(0)
+    work = [random.randint(1, args.candidates) for _ in range(args.sessions)]
+    lock = threading.Lock()
+
+    def worker():
+        client = app_module.app.test_client()
+        while True:
+            with lock:
+                if not work:
+                    return
+                candidate_id = work.pop()
+            local = defaultdict(list)
+            candidate_session(client, candidate_id, tests_per_candidate, questions_per_test, local)
+            with lock:
+                for name, values in local.items():
+                    timings[name].extend(values)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(values) for values in timings.values())
+    print(f"{'step':<18}{'requests':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, values in timings.items():
+        values.sort()
+        pick = lambda q: values[min(len(values) - 1, int(len(values) * q))]
+        print(f"{name:<18}{len(values):>9}{pick(0.5):>10.2f}{pick(0.95):>10.2f}{pick(0.99):>10.2f}")
+    print(f"{requests} requests in {elapsed:.1f}s = {requests / elapsed:.0f} req/s\n")
+
+
+def main():
+    args = parse_args()
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='interview-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(database)}'
+
+    import app as app_module
+    tests_per_candidate, questions_per_test = 2, 5
+
+    with app_module.app.app_context():
+        seed(app_module, args.candidates, tests_per_candidate, questions_per_test)
+        seed_users(app_module, args.candidates)
+
+        print(f"Baseline: no secondary indexes, rollback journal ({args.concurrency} concurrent candidates)")
+        use_baseline_profile(app_module)
+    run_profile(app_module, args, tests_per_candidate, questions_per_test)
+
+    with app_module.app.app_context():
+        print(f"Optimized: schema indexes, WAL profile ({args.concurrency} concurrent candidates)")
+        use_optimized_profile(app_module)
+    run_profile(app_module, args, tests_per_candidate, questions_per_test)
+
+
+if __name__ == '__main__':
+    main()
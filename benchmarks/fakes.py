@@ -0,0 +1,175 @@
+"""
+Local stand-ins for the app's external and heavy dependencies, so load tests
+run offline and cost nothing.
+
+`FakeOpenAIServer` speaks enough of the OpenAI HTTP API for the app's clients
+(completions, streamed completions, audio transcriptions) and sleeps for a
+configurable latency per call. Point the app at it by setting
+`OPENAI_BASE_URL` before the app is imported; both the `openai` client and
+LangChain's `OpenAI` (which is handed the same client) then use it.
+`FakeQAPipeline` replaces the transformers question-answering pipeline.
+"""
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEEDBACK_TEXT = """SCORE: 7
+GRAMMAR: Mostly correct, with a few tense errors.
+FLUENCY: Clear and well paced.
+SUGGESTIONS:
+- Give a concrete example.
+- Summarize the trade-offs at the end."""
+
+QUESTIONS_TEXT = """Q: What is a race condition?
+C: A race condition occurs when the outcome depends on the timing of concurrent operations.
+
+Q: How do you choose between a list and a set?
+C: Sets give constant-time membership tests while lists keep order and duplicates.
+
+Q: What does an index do in a database?
+C: An index lets the database find rows without scanning the whole table."""
+
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server answering OpenAI API calls after a simulated delay.
+
+    Args:
+        llm_latency_ms (float): Mean delay of a completion (time to first chunk when streamed)
+        whisper_latency_ms (float): Mean delay of a transcription
+        jitter (float): Delays vary uniformly by +/- this fraction of the mean
+        stream_chunk_ms (float): Delay between streamed completion chunks
+        port (int): Port to listen on (0 picks a free one)
+    """
+
+    def __init__(self, llm_latency_ms=800, whisper_latency_ms=400, jitter=0.2, stream_chunk_ms=10, port=0):
+        self.llm_latency = llm_latency_ms / 1000.0
+        self.whisper_latency = whisper_latency_ms / 1000.0
+        self.jitter = jitter
+        self.stream_chunk = stream_chunk_ms / 1000.0
+        self.calls = {'completions': 0, 'transcriptions': 0}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _delay(self, mean):
+        if mean > 0:
+            time.sleep(mean * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _count(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+        return next(self._counter)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path.endswith('/audio/transcriptions'):
+                    call = server._count('transcriptions')
+                    server._delay(server.whisper_latency)
+                    # A different transcript per call, so the feedback cache doesn't hide LLM latency
+                    self._send(f"Simulated answer number {call} about trade-offs and a concrete example.",
+                               'text/plain')
+                elif self.path.endswith('/completions'):
+                    server._count('completions')
+                    request = json.loads(body or b'{}')
+                    prompt = json.dumps(request.get('prompt', ''))
+                    text = QUESTIONS_TEXT if 'interviewer' in prompt else FEEDBACK_TEXT
+                    server._delay(server.llm_latency)
+                    if request.get('stream'):
+                        self._stream(text)
+                    else:
+                        self._send(json.dumps(self._completion(text, 'stop')), 'application/json')
+                else:
+                    self._send(json.dumps({'error': {'message': f'Unknown path {self.path}'}}),
+                               'application/json', status=404)
+
+            def _completion(self, text, finish_reason):
+                return {
+                    'id': 'cmpl-fake', 'object': 'text_completion', 'created': int(time.time()), 'model': 'fake',
+                    'choices': [{'text': text, 'index': 0, 'finish_reason': finish_reason, 'logprobs': None}],
+                    'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+                }
+
+            def _send(self, text, content_type, status=200):
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                def write(data):
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                    self.wfile.flush()
+
+                words = text.split(' ')
+                for i, word in enumerate(words):
+                    chunk = self._completion(word if i == len(words) - 1 else word + ' ', None)
+                    write(b'data: ' + json.dumps(chunk).encode('utf-8') + b'\n\n')
+                    if server.stream_chunk > 0:
+                        time.sleep(server.stream_chunk)
+                write(b'data: [DONE]\n\n')
+                write(b'')
+
+        return Handler
+
+
+class FakeQAPipeline:
+    """
+    Accepts the call forms of the transformers question-answering pipeline
+    and returns the context's first sentence after a simulated forward pass.
+
+    Args:
+        latency_ms (float): Delay per call
+        per_item_ms (float): Additional delay per question in a batch
+    """
+
+    def __init__(self, latency_ms=30, per_item_ms=5):
+        self.latency = latency_ms / 1000.0
+        self.per_item = per_item_ms / 1000.0
+
+    def __call__(self, inputs=None, question=None, context=None, batch_size=None, **kwargs):
+        if inputs is not None:
+            question, context = inputs['question'], inputs['context']
+        single = isinstance(question, str)
+        contexts = [context] if single else list(context)
+
+        time.sleep(self.latency + self.per_item * len(contexts))
+        results = []
+        for text in contexts:
+            end = text.find('.') + 1 or len(text)
+            results.append({'answer': text[:end], 'score': 0.9, 'start': 0, 'end': end})
+        return results[0] if single else results
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class CoalescingCache:
+    """
+    In-memory LRU cache with a time-to-live that also coalesces concurrent misses.
+
+    When several threads ask for the same missing key at once, only the first
+    runs `compute`; the others wait on its result. Failures are not cached and
+    are re-raised to every waiting caller.
+    """
+
+    def __init__(self, max_entries=1000, ttl_seconds=3600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, computing it at most once across threads.
+
+        Args:
+            key: Hashable cache key
+            compute: Zero-argument callable producing the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = Future()
+                self._in_flight[key] = future
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        self.set(key, value)
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
@@ -0,0 +1,120 @@
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+limiter_in_flight = metrics.gauge('interview_limiter_in_flight', 'Calls holding a limiter slot', ['limiter'])
+limiter_waiting = metrics.gauge('interview_limiter_waiting', 'Calls waiting for a limiter slot', ['limiter'])
+limiter_wait_seconds = metrics.histogram(
+    'interview_limiter_wait_seconds', 'Time spent waiting for a limiter slot', ['limiter', 'outcome']
+)
+
+
+_torch_threads = None
+_torch_threads_lock = threading.Lock()
+
+
+def configure_torch_threads(threads):
+    """
+    Set torch's intra-op thread count, shared by every model in the process
+    (the QA model and local Whisper), and pin inter-op threads to 1.
+
+    The first caller decides; later calls asking for a different count are
+    ignored with a warning, so whichever model loads last can't silently
+    replace the other's setting.
+
+    Returns:
+        int: The thread count in effect
+    """
+    global _torch_threads
+    threads = max(1, int(threads))
+    with _torch_threads_lock:
+        if _torch_threads is None:
+            import torch
+            torch.set_num_threads(threads)
+            try:
+                # Batches and chunks are the unit of parallelism; inter-op threads would only oversubscribe the cores
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Can only be set before the first parallel operation
+            _torch_threads = threads
+        elif threads != _torch_threads:
+            logger.warning("Torch already uses %d threads; ignoring a request for %d", _torch_threads, threads)
+        return _torch_threads
+
+
+class CapacityExceeded(Exception):
+    """
+    Raised when a call can't get capacity in time; the app answers with
+    `status` and a Retry-After header instead of tying up the request.
+    """
+
+    def __init__(self, message, retry_after=1, status=503):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        self.status = status
+
+
+class ConcurrencyLimiter:
+    """
+    Bounds how many calls to an external service run at once.
+
+    Calls beyond `max_concurrent` wait up to `max_wait` seconds for a slot and
+    then fail with CapacityExceeded, so a slow upstream makes requests queue
+    briefly and shed load rather than pile up unbounded. The semaphore comes
+    from `threading`, so in the gevent serving mode (see serve.py) waiting
+    yields to other requests instead of blocking the process.
+    """
+
+    def __init__(self, name, max_concurrent=16, max_wait=30.0):
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_wait = max(0.0, float(max_wait))
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        limiter_in_flight.set_function(lambda: self.in_flight, limiter=name)
+        limiter_waiting.set_function(lambda: self.waiting, limiter=name)
+
+    @contextmanager
+    def slot(self):
+        start = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._semaphore.acquire(timeout=self.max_wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        limiter_wait_seconds.observe(
+            time.perf_counter() - start, limiter=self.name, outcome='acquired' if acquired else 'rejected'
+        )
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise CapacityExceeded(f"Too many concurrent {self.name} calls, please retry shortly")
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'rejected': self.rejected
+            }
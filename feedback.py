@@ -0,0 +1,131 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCORE = 7.0  # Default score if parsing fails
+
+FEEDBACK_SECTIONS = ('grammar', 'fluency', 'suggestions')
+
+FALLBACK_FEEDBACK = {
+    'grammar': "Unable to assess grammar at this time.",
+    'fluency': "Unable to assess fluency at this time.",
+    'suggestions': "Please try recording your answer again."
+}
+
+# Feedback used to be stored as this HTML; the pattern recovers its sections
+_FEEDBACK_HTML = re.compile(
+    r'<p><strong>Grammar:</strong>(?P<grammar>.*?)</p>\s*'
+    r'<p><strong>Fluency:</strong>(?P<fluency>.*?)</p>\s*'
+    r'<p><strong>Suggestions for improvement:</strong></p>\s*'
+    r'<p>(?P<suggestions>.*?)</p>',
+    re.DOTALL
+)
+
+
+class FeedbackParser:
+    """
+    Incremental parser for the SCORE/GRAMMAR/FLUENCY/SUGGESTIONS feedback format.
+
+    Text can be fed in arbitrary chunks as the LLM streams it; each completed
+    line that changes a section is reported as a (section, value) update.
+    Everything after SUGGESTIONS is treated as further suggestions.
+    """
+
+    def __init__(self):
+        self.score = DEFAULT_SCORE
+        self.grammar = "Grammar assessment not available"
+        self.fluency = "Fluency assessment not available"
+        self.suggestions = "No suggestions available"
+        self._buffer = ""
+        self._in_suggestions = False
+
+    def feed(self, text):
+        self._buffer += text
+        updates = []
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            update = self._parse_line(line.strip())
+            if update:
+                updates.append(update)
+        return updates
+
+    def finish(self):
+        line, self._buffer = self._buffer, ""
+        update = self._parse_line(line.strip())
+        return [update] if update else []
+
+    def _parse_line(self, line):
+        if not line:
+            return None
+
+        if self._in_suggestions:
+            # Add any remaining lines
+            self.suggestions += "\n" + line
+            return ('suggestions', self.suggestions)
+
+        if line.startswith('SCORE:'):
+            try:
+                score_text = line.split('SCORE:')[1].strip()
+                # Extract just the number
+                self.score = float(score_text.split()[0])
+            except (ValueError, IndexError):
+                # If parsing fails, keep default score
+                pass
+            return ('score', self.score)
+        elif line.startswith('GRAMMAR:'):
+            self.grammar = line.split('GRAMMAR:')[1].strip()
+            return ('grammar', self.grammar)
+        elif line.startswith('FLUENCY:'):
+            self.fluency = line.split('FLUENCY:')[1].strip()
+            return ('fluency', self.fluency)
+        elif line.startswith('SUGGESTIONS:'):
+            self.suggestions = line.split('SUGGESTIONS:')[1].strip()
+            self._in_suggestions = True
+            return ('suggestions', self.suggestions)
+        return None
+
+    def result(self):
+        return {
+            'score': self.score,
+            'grammar': self.grammar,
+            'fluency': self.fluency,
+            'suggestions': self.suggestions
+        }
+
+
+def parse_feedback(feedback_result):
+    """
+    Parse a complete feedback completion.
+
+    Args:
+        feedback_result (str): Raw LLM output in the SCORE/GRAMMAR/FLUENCY/SUGGESTIONS format
+
+    Returns:
+        dict: 'score', 'grammar', 'fluency' and 'suggestions', with defaults for missing sections
+    """
+    parser = FeedbackParser()
+    try:
+        parser.feed(feedback_result)
+        parser.finish()
+    except Exception as e:
+        logger.warning("Error parsing feedback result: %s", e)
+        # Keep default values if parsing fails
+    return parser.result()
+
+
+def parse_feedback_html(feedback_html):
+    """
+    Recover the sections of feedback stored in the old HTML format.
+
+    Returns:
+        dict: 'grammar', 'fluency' and 'suggestions', or None if the text isn't in that format
+    """
+    match = _FEEDBACK_HTML.search(feedback_html or "")
+    if not match:
+        return None
+    return {
+        # The old format inserted the text unescaped, so only the line breaks need undoing
+        section: match.group(section).replace('<br>', '\n').strip()
+        for section in FEEDBACK_SECTIONS
+    }
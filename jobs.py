@@ -0,0 +1,48 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorkerPool:
+    """
+    Thread pool that runs jobs outside the request cycle, each inside a Flask
+    application context so it can use the database session.
+
+    The executor is created on first submit, so importing the app or forking
+    server workers doesn't start threads.
+    """
+
+    def __init__(self, app, max_workers=4, name='worker'):
+        self.app = app
+        self.max_workers = max(1, int(max_workers))
+        self.name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.name
+                    )
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        return self._get_executor().submit(self._run, fn, *args, **kwargs)
+
+    def _run(self, fn, *args, **kwargs):
+        with self.app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                logger.exception("Error in background job %s", fn.__name__)
+                raise
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+
+import httpx
+import openai
+
+from concurrency import ConcurrencyLimiter
+from metrics import metrics, timed_stage
+
+# Bump whenever FEEDBACK_PROMPT changes so cached feedback from the old prompt is not reused
+FEEDBACK_PROMPT_VERSION = '1'
+
+FEEDBACK_PROMPT = """You are an expert English language evaluator. Your task is to evaluate the grammatical correctness and fluency of the following answer.
+
+            Answer: {answer}
+            
+            IMPORTANT: This text has been converted from speech using speech-to-text technology. 
+            Please be understanding of potential transcription errors and focus on evaluating the 
+            grammatical structure and fluency that can be reasonably inferred from the text.
+            
+            Please evaluate ONLY the grammatical correctness and fluency of the answer, NOT the content or correctness of the information.
+            
+            Provide your evaluation in the EXACT format below:
+            
+            SCORE: [number between 1-10]
+            GRAMMAR: [brief assessment of grammar]
+            FLUENCY: [brief assessment of fluency]
+            SUGGESTIONS: [2-3 specific suggestions for improvement]
+            
+            Do not deviate from this format. Do not evaluate the content or correctness of the answer.
+            """
+
+QUESTION_GENERATION_PROMPT = """You are an expert technical interviewer. Generate {num_questions} interview questions 
+        for a {position} position. For each question, also provide a detailed context/answer that would be 
+        considered a strong response. The questions should be:
+        1. Technical and relevant to the position
+        2. Open-ended to assess problem-solving skills
+        3. Include both theoretical and practical aspects
+        4. Suitable for assessing both technical knowledge and soft skills
+        
+        Format each question and its context as follows:
+        Q: [Question text ending with a question mark]
+        C: [Detailed context/answer that would be considered a strong response]
+        
+        Return the questions and context in this format, with each Q/C pair separated by a blank line.
+        Do not include any additional text or numbering."""
+
+
+llm_call_seconds = metrics.histogram(
+    'interview_llm_call_duration_seconds',
+    'Duration of OpenAI calls (LLM completions and Whisper) by call type and outcome',
+    ['call', 'outcome']
+)
+
+
+class CallStats:
+    """Thread-safe per-call-type latency counters, also exported as a histogram."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, seconds, ok=True):
+        llm_call_seconds.observe(seconds, call=name, outcome='success' if ok else 'error')
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'calls': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+                'last_seconds': None
+            })
+            stats['calls'] += 1
+            if not ok:
+                stats['errors'] += 1
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['last_seconds'] = seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(stats, avg_seconds=stats['total_seconds'] / stats['calls'])
+                for name, stats in self._stats.items()
+            }
+
+
+class LLMProvider:
+    """
+    Process-wide access to OpenAI and LangChain clients.
+
+    All clients share one keep-alive HTTP connection pool, so answers don't pay
+    TCP/TLS setup on every call. Timeouts and retry counts are configurable; the
+    OpenAI SDK retries connection errors, 429s and 5xx responses with
+    exponential backoff. Every call made through `timed` is recorded in `stats`
+    and holds a slot of `limiter` while it runs, so at most `max_concurrent`
+    calls are in flight and the rest wait up to `queue_timeout` seconds.
+    """
+
+    def __init__(self, api_key=None, timeout=30.0, max_retries=2, max_connections=20,
+                 max_concurrent=None, queue_timeout=30.0):
+        self.api_key = api_key
+        self.timeout = float(timeout)
+        self.max_retries = int(max_retries)
+        self.max_connections = int(max_connections)
+        self.stats = CallStats()
+        self.limiter = ConcurrencyLimiter(
+            'openai', max_concurrent=max_concurrent or self.max_connections, max_wait=queue_timeout
+        )
+        self._http_client = None
+        self._openai_client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=os.getenv('OPENAI_TIMEOUT', 30.0),
+            max_retries=os.getenv('OPENAI_MAX_RETRIES', 2),
+            max_connections=os.getenv('OPENAI_MAX_CONNECTIONS', 20),
+            max_concurrent=os.getenv('OPENAI_MAX_CONCURRENCY'),
+            queue_timeout=os.getenv('OPENAI_QUEUE_TIMEOUT', 30.0)
+        )
+
+    def http_client(self):
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections
+                        )
+                    )
+        return self._http_client
+
+    def openai_client(self):
+        if self._openai_client is None:
+            http_client = self.http_client()
+            with self._lock:
+                if self._openai_client is None:
+                    self._openai_client = openai.OpenAI(
+                        api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                        timeout=self.timeout,
+                        max_retries=self.max_retries,
+                        http_client=http_client
+                    )
+        return self._openai_client
+
+    def create_llm(self, temperature):
+        from langchain.llms import OpenAI
+        # Hand LangChain the pooled client so completions reuse its connections
+        return OpenAI(
+            temperature=temperature,
+            request_timeout=self.timeout,
+            max_retries=self.max_retries,
+            client=self.openai_client().completions
+        )
+
+    def create_chain(self, template, input_variables, temperature):
+        """
+        Build an LLMChain once so prompt parsing and client setup aren't repeated per call.
+
+        Args:
+            template (str): Prompt template text
+            input_variables (list): Names of the template's placeholders
+            temperature (float): Sampling temperature for the LLM
+
+        Returns:
+            LLMChain: The ready-to-run chain
+        """
+        from langchain.prompts import PromptTemplate
+        from langchain.chains import LLMChain
+
+        prompt = PromptTemplate(input_variables=input_variables, template=template)
+        return LLMChain(llm=self.create_llm(temperature), prompt=prompt)
+
+    def timed_stream(self, name, chunks, stage='llm'):
+        """
+        Pass through a streamed response, recording time to first chunk and total time.
+
+        Args:
+            name (str): Stats name; the first-chunk latency is recorded as `<name>_first_chunk`
+            chunks: Iterator of response chunks
+            stage (str): Request stage the call's duration is reported under
+        """
+        with self.limiter.slot():
+            start = time.perf_counter()
+            first = True
+            with timed_stage(stage):
+                try:
+                    for chunk in chunks:
+                        if first:
+                            self.stats.record(f"{name}_first_chunk", time.perf_counter() - start)
+                            first = False
+                        yield chunk
+                except Exception:
+                    self.stats.record(name, time.perf_counter() - start, ok=False)
+                    raise
+            self.stats.record(name, time.perf_counter() - start)
+
+    def timed(self, name, fn, *args, stage='llm', **kwargs):
+        with self.limiter.slot():
+            start = time.perf_counter()
+            try:
+                with timed_stage(stage):
+                    result = fn(*args, **kwargs)
+            except Exception:
+                self.stats.record(name, time.perf_counter() - start, ok=False)
+                raise
+            self.stats.record(name, time.perf_counter() - start)
+            return result
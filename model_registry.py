@@ -0,0 +1,81 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Lazily constructs heavyweight shared resources (the QA pipeline, LangChain
+    clients) on first use instead of at import time.
+
+    Each resource is registered with a zero-argument loader. The first call to
+    `get(name)` runs the loader under a per-resource lock, so concurrent threads
+    asking for the same resource wait for a single load and then share the
+    instance. Load durations are recorded for the warm-up endpoint.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._locks = {}
+        self._instances = {}
+        self._load_times = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+            self._load_times.pop(name, None)
+
+    def get(self, name):
+        # Fast path: already loaded, no locking needed
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = self._loaders[name]()
+                self._load_times[name] = time.perf_counter() - start
+                self._instances[name] = instance
+        return instance
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def warm(self, names=None):
+        """
+        Load the given resources (or every registered one) and return their status.
+
+        Args:
+            names (list): Resource names to load, defaults to all registered
+
+        Returns:
+            dict: Mapping of name to {'loaded', 'load_seconds', 'error'}
+        """
+        results = {}
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+                results[name] = {'loaded': True, 'load_seconds': self._load_times.get(name), 'error': None}
+            except Exception as e:
+                results[name] = {'loaded': False, 'load_seconds': None, 'error': str(e)}
+        return results
+
+    def stats(self):
+        return {
+            name: {
+                'loaded': name in self._instances,
+                'load_seconds': self._load_times.get(name)
+            }
+            for name in self._loaders
+        }
+
+
+registry = ModelRegistry()
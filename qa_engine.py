@@ -0,0 +1,380 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from concurrency import CapacityExceeded
+from metrics import metrics, timed_stage
+
+logger = logging.getLogger(__name__)
+
+qa_queue_wait_seconds = metrics.histogram(
+    'interview_qa_queue_wait_seconds', 'Time question/context pairs wait before their QA batch starts'
+)
+qa_rejected = metrics.counter('interview_qa_rejected_total', 'QA requests turned away because the queue was full')
+
+
+class TextEncoding:
+    """
+    A question or context tokenized once for the QA model: token ids without
+    special tokens plus each token's character span, as compact uint32 arrays
+    (12 bytes per token) that can be stored in the database.
+    """
+
+    def __init__(self, token_ids, offsets):
+        self.token_ids = np.asarray(token_ids, dtype=np.uint32)
+        self.offsets = np.asarray(offsets, dtype=np.uint32).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    @classmethod
+    def from_text(cls, tokenizer, text):
+        encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return cls(encoded['input_ids'], encoded['offset_mapping'])
+
+    @classmethod
+    def from_bytes(cls, token_ids, offsets):
+        return cls(np.frombuffer(token_ids, dtype='<u4'), np.frombuffer(offsets, dtype='<u4'))
+
+    def to_bytes(self):
+        return self.token_ids.astype('<u4').tobytes(), self.offsets.astype('<u4').tobytes()
+
+
+class EncodedQA:
+    """
+    Extractive QA over pre-tokenized questions and contexts.
+
+    Does what the question-answering pipeline does after tokenization: splits
+    the context into overlapping windows that fit next to the question, runs
+    all windows of a batch through the model in one padded forward pass, and
+    picks the most probable span of at most `max_answer_len` tokens. The
+    defaults match the pipeline's, so answers and scores agree with it.
+    """
+
+    def __init__(self, qa_pipeline, max_seq_len=384, doc_stride=128, max_answer_len=15):
+        self.tokenizer = qa_pipeline.tokenizer
+        self.model = qa_pipeline.model
+        self.max_seq_len = min(max_seq_len, self.tokenizer.model_max_length)
+        self.doc_stride = min(doc_stride, self.max_seq_len // 2)
+        self.max_answer_len = max_answer_len
+        self._layout = self._pair_layout()
+
+    def _pair_layout(self):
+        # Find where the tokenizer puts special tokens around a (question, context) pair
+        special = set(self.tokenizer.all_special_ids)
+        a, b = [i for i in range(len(self.tokenizer)) if i not in special][:2]
+        ids = self.tokenizer.build_inputs_with_special_tokens([a], [b])
+        types = self.tokenizer.create_token_type_ids_from_sequences([a], [b])
+        ia, ib = ids.index(a), ids.index(b)
+        return {
+            'prefix': (ids[:ia], types[:ia]),
+            'between': (ids[ia + 1:ib], types[ia + 1:ib]),
+            'suffix': (ids[ib + 1:], types[ib + 1:]),
+            'question_type': types[ia],
+            'context_type': types[ib]
+        }
+
+    def windows(self, question, context):
+        """
+        Returns:
+            list: (input_ids, token_type_ids, context start in the input, first context token, context token count)
+        """
+        layout = self._layout
+        prefix_ids, prefix_types = layout['prefix']
+        between_ids, between_types = layout['between']
+        suffix_ids, suffix_types = layout['suffix']
+
+        question_ids = question.token_ids.tolist()
+        head_ids = prefix_ids + question_ids + between_ids
+        head_types = prefix_types + [layout['question_type']] * len(question_ids) + between_types
+        available = self.max_seq_len - len(head_ids) - len(suffix_ids)
+        if available <= 0:
+            raise ValueError("Question is too long for the QA model")
+
+        windows = []
+        step = max(1, available - self.doc_stride)
+        for start in range(0, max(1, len(context)), step):
+            context_ids = context.token_ids[start:start + available].tolist()
+            windows.append((
+                head_ids + context_ids + suffix_ids,
+                head_types + [layout['context_type']] * len(context_ids) + suffix_types,
+                len(head_ids),
+                start,
+                len(context_ids)
+            ))
+            if start + available >= len(context):
+                break
+        return windows
+
+    def answer_many(self, items):
+        """
+        Args:
+            items (list): (question TextEncoding, context TextEncoding, context text) tuples
+
+        Returns:
+            list: {'score', 'start', 'end', 'answer'} dictionaries in input order
+        """
+        import torch
+
+        windows = [(i, window) for i, (question, context, _) in enumerate(items)
+                   for window in self.windows(question, context)]
+        width = max(len(window[0]) for _, window in windows)
+        pad_id = self.tokenizer.pad_token_id or 0
+
+        input_ids = np.full((len(windows), width), pad_id, dtype=np.int64)
+        token_type_ids = np.zeros((len(windows), width), dtype=np.int64)
+        attention_mask = np.zeros((len(windows), width), dtype=np.int64)
+        for row, (_, (ids, types, _, _, _)) in enumerate(windows):
+            input_ids[row, :len(ids)] = ids
+            token_type_ids[row, :len(types)] = types
+            attention_mask[row, :len(ids)] = 1
+
+        inputs = {
+            'input_ids': torch.from_numpy(input_ids),
+            'token_type_ids': torch.from_numpy(token_type_ids),
+            'attention_mask': torch.from_numpy(attention_mask)
+        }
+        inputs = {name: value for name, value in inputs.items() if name in self.tokenizer.model_input_names}
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+        start_logits = outputs.start_logits.float().numpy()
+        end_logits = outputs.end_logits.float().numpy()
+
+        best = [None] * len(items)
+        cls_id = self.tokenizer.cls_token_id
+        for row, (i, (ids, _, context_start, first_token, count)) in enumerate(windows):
+            if count == 0:
+                continue
+            span = slice(context_start, context_start + count)
+            # Like the pipeline, the CLS token takes part in the softmax but can't be the answer
+            has_cls = cls_id is not None and cls_id in ids
+            cls_index = ids.index(cls_id) if has_cls else None
+            p_start = self._context_probabilities(start_logits[row], span, cls_index)
+            p_end = self._context_probabilities(end_logits[row], span, cls_index)
+
+            candidates = np.tril(np.triu(np.outer(p_start, p_end)), self.max_answer_len - 1)
+            start, end = np.unravel_index(np.argmax(candidates), candidates.shape)
+            score = float(candidates[start, end])
+            if best[i] is None or score > best[i][0]:
+                best[i] = (score, first_token + start, first_token + end)
+
+        results = []
+        for (_, context, text), found in zip(items, best):
+            if found is None:
+                results.append({'score': 0.0, 'start': 0, 'end': 0, 'answer': ''})
+                continue
+            score, start_token, end_token = found
+            start_char, end_char = int(context.offsets[start_token][0]), int(context.offsets[end_token][1])
+            results.append({'score': score, 'start': start_char, 'end': end_char, 'answer': text[start_char:end_char]})
+        return results
+
+    @staticmethod
+    def _context_probabilities(logits, span, cls_index):
+        allowed = logits[span]
+        if cls_index is not None:
+            allowed = np.concatenate([allowed, logits[cls_index:cls_index + 1]])
+        probabilities = np.exp(allowed - allowed.max())
+        probabilities /= probabilities.sum()
+        return probabilities[:span.stop - span.start]
+
+
+class QABatcher:
+    """
+    Micro-batching inference executor that owns the question-answering pipeline.
+
+    Callers submit (question, context) pairs from any thread. A worker thread
+    waits up to `max_wait_ms` after the first pending request to collect
+    more, then runs them through the pipeline as one padded batch. Each caller
+    gets a Future resolved with its own result. Pairs submitted with
+    precomputed encodings skip tokenization and go straight to `EncodedQA`.
+
+    At most `max_concurrency` batches run at once (one per worker thread), so
+    request threads never call the model directly and can't oversubscribe the
+    CPU. At most `max_queue` pairs wait; beyond that `submit` raises
+    CapacityExceeded (HTTP 429) with a Retry-After estimated from recent batch
+    times, unless the caller asks to block until there is room.
+    """
+
+    def __init__(self, pipeline_getter, max_batch_size=16, max_wait_ms=5, max_concurrency=1, max_queue=256):
+        self._pipeline_getter = pipeline_getter
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, float(max_wait_ms)) / 1000.0
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(1, int(max_queue))
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._workers = []
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._encoded_qa = None
+        self._seconds_per_item = None  # Moving average of forward-pass time per pair
+        self.batches_run = 0
+        self.items_processed = 0
+        self.encoded_items = 0
+        self.rejected = 0
+
+    def _ensure_worker(self):
+        # Started lazily so importing the app (or forking workers) doesn't spawn threads
+        if len(self._workers) == self.max_concurrency and all(worker.is_alive() for worker in self._workers):
+            return
+        with self._worker_lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.max_concurrency:
+                worker = threading.Thread(target=self._run, name=f'qa-batcher-{len(self._workers)}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, question, context, encodings=None, block=False):
+        """
+        Args:
+            question (str): The question text
+            context (str): The context text
+            encodings (tuple): Optional (question, context) TextEncodings of the same texts
+            block (bool): Wait for room when the queue is full instead of raising
+                CapacityExceeded; for background jobs that have no client to retry
+
+        Raises:
+            CapacityExceeded: The queue is full and `block` is false
+        """
+        future = Future()
+        self._ensure_worker()
+        item = (question, context, encodings, future, time.monotonic())
+        if block:
+            self._queue.put(item)
+            return future
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            qa_rejected.inc()
+            raise CapacityExceeded("The QA model is busy, please retry shortly", self.retry_after(), status=429)
+        return future
+
+    def retry_after(self):
+        """Seconds until the current queue has likely drained."""
+        seconds_per_item = self._seconds_per_item or 0.1
+        return self.queue_depth * seconds_per_item / self.max_concurrency
+
+    @property
+    def queue_depth(self):
+        """Pairs waiting for the next batch."""
+        return self._queue.qsize()
+
+    def answer(self, question, context, timeout=None):
+        return self.submit(question, context).result(timeout=timeout)
+
+    def answer_many(self, pairs, timeout=None):
+        """
+        Submit several (question, context) pairs at once and wait for all of them.
+
+        Args:
+            pairs (list): List of (question, context) tuples
+            timeout (float): Seconds to wait for each result
+
+        Returns:
+            list: Pipeline results in the same order as `pairs`
+        """
+        futures = [self.submit(question, context) for question, context in pairs]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queue_depth': self.queue_depth,
+                'max_queue': self.max_queue,
+                'max_concurrency': self.max_concurrency,
+                'batches_run': self.batches_run,
+                'items_processed': self.items_processed,
+                'encoded_items': self.encoded_items,
+                'rejected': self.rejected,
+                'seconds_per_item': self._seconds_per_item
+            }
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            # Skip requests whose callers have already given up
+            batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+            if batch:
+                started = time.monotonic()
+                for item in batch:
+                    qa_queue_wait_seconds.observe(started - item[4])
+                self._process(batch)
+                self._record_batch(len(batch), time.monotonic() - started)
+
+    def _record_batch(self, size, seconds):
+        with self._stats_lock:
+            per_item = seconds / size
+            if self._seconds_per_item is None:
+                self._seconds_per_item = per_item
+            else:
+                self._seconds_per_item = 0.8 * self._seconds_per_item + 0.2 * per_item
+            self.batches_run += 1
+            self.items_processed += size
+
+    def _get_encoded_qa(self, qa_pipeline):
+        if self._encoded_qa is None or self._encoded_qa.model is not qa_pipeline.model:
+            self._encoded_qa = EncodedQA(qa_pipeline)
+        return self._encoded_qa
+
+    def _process(self, batch):
+        encoded = [item for item in batch if item[2] is not None]
+        if encoded:
+            try:
+                with timed_stage('qa_forward'):
+                    results = self._get_encoded_qa(self._pipeline_getter()).answer_many(
+                        [(question_encoding, context_encoding, context)
+                         for _, context, (question_encoding, context_encoding), _, _ in encoded]
+                    )
+                for (_, _, _, future, _), result in zip(encoded, results):
+                    future.set_result(result)
+                with self._stats_lock:
+                    self.encoded_items += len(encoded)
+                batch = [item for item in batch if item[2] is None]
+            except Exception as e:
+                # Let the pipeline tokenize these itself
+                logger.warning("Error answering from precomputed encodings: %s", e)
+        if batch:
+            self._process_texts(batch)
+
+    def _process_texts(self, batch):
+        try:
+            qa_pipeline = self._pipeline_getter()
+            with timed_stage('qa_forward'):
+                results = qa_pipeline(
+                    question=[question for question, _, _, _, _ in batch],
+                    context=[context for _, context, _, _, _ in batch],
+                    batch_size=len(batch)
+                )
+            # The pipeline unwraps single-item inputs into a bare dict
+            if isinstance(results, dict):
+                results = [results]
+            for (_, _, _, future, _), result in zip(batch, results):
+                future.set_result(result)
+        except Exception:
+            # Fall back to one-by-one so a single bad input doesn't fail the whole batch
+            for question, context, _, future, _ in batch:
+                try:
+                    with timed_stage('qa_forward'):
+                        result = self._pipeline_getter()({"question": question, "context": context})
+                    future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
@@ -0,0 +1,229 @@
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from concurrency import configure_torch_threads
+from qa_engine import EncodedQA, TextEncoding
+
+# 'torch' is the full-precision model as shipped; the others trade a little accuracy for CPU speed
+QA_RUNTIMES = ('torch', 'quantized', 'onnx', 'onnx-int8')
+
+# safetensors dtype names that map directly onto NumPy (bfloat16 has no NumPy equivalent)
+SAFETENSORS_DTYPES = {'F64': '<f8', 'F32': '<f4', 'F16': '<f2', 'I64': '<i8', 'I32': '<i4', 'I8': 'i1', 'U8': 'u1'}
+
+
+class EncodedQAPipeline:
+    """
+    Stands in for the transformers question-answering pipeline when the model
+    isn't a PyTorch module (an ONNX Runtime session). Accepts the same call
+    forms as the pipeline and answers through `EncodedQA`.
+    """
+
+    def __init__(self, tokenizer, model):
+        self.tokenizer = tokenizer
+        self.model = model
+        self._encoded_qa = EncodedQA(self)
+
+    def __call__(self, inputs=None, question=None, context=None, batch_size=None, **kwargs):
+        if inputs is not None:
+            question, context = inputs['question'], inputs['context']
+        single = isinstance(question, str)
+        questions = [question] if single else list(question)
+        contexts = [context] if single else list(context)
+
+        results = self._encoded_qa.answer_many([
+            (TextEncoding.from_text(self.tokenizer, q), TextEncoding.from_text(self.tokenizer, c), c)
+            for q, c in zip(questions, contexts)
+        ])
+        return results[0] if single else results
+
+
+class OnnxQAModel:
+    """Runs an exported QA graph with ONNX Runtime, returning outputs shaped like the PyTorch model's."""
+
+    def __init__(self, path, threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {graph_input.name for graph_input in self.session.get_inputs()}
+
+    def __call__(self, **inputs):
+        import torch
+        from transformers.modeling_outputs import QuestionAnsweringModelOutput
+
+        feed = {name: value.numpy() for name, value in inputs.items() if name in self.input_names}
+        start_logits, end_logits = self.session.run(['start_logits', 'end_logits'], feed)
+        return QuestionAnsweringModelOutput(
+            start_logits=torch.from_numpy(start_logits),
+            end_logits=torch.from_numpy(end_logits)
+        )
+
+
+def mmap_safetensor(path, suffix):
+    """
+    Map a tensor of a .safetensors file into memory read-only, without copying it.
+
+    The pages come from the OS page cache, so every process that maps the same
+    file shares one copy of the weights.
+
+    Args:
+        path (str): The .safetensors file
+        suffix (str): End of the tensor's name, e.g. 'word_embeddings.weight'
+
+    Returns:
+        np.memmap: The tensor, or None if no tensor matches or its dtype has no NumPy equivalent
+    """
+    with open(path, 'rb') as f:
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_size))
+    for name, info in header.items():
+        if name == '__metadata__' or not name.endswith(suffix):
+            continue
+        dtype = SAFETENSORS_DTYPES.get(info['dtype'])
+        if dtype is None:
+            return None
+        start, _ = info['data_offsets']
+        return np.memmap(path, dtype=dtype, mode='r', offset=8 + header_size + start, shape=tuple(info['shape']))
+    return None
+
+
+def quantize_model(model):
+    """Dynamically quantize the model's linear layers to int8 (weights int8, activations quantized per batch)."""
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_onnx(model, tokenizer, path, quantize=False):
+    """
+    Export a QA model to ONNX with dynamic batch and sequence axes, optionally
+    with int8 weights. Written atomically so concurrent workers never load a
+    partial file.
+    """
+    import torch
+
+    names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in tokenizer.model_input_names]
+    sample = tokenizer("What is this?", "This is a sample context.", return_tensors='pt')
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in names}
+    dynamic_axes.update({'start_logits': {0: 'batch', 1: 'sequence'}, 'end_logits': {0: 'batch', 1: 'sequence'}})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    os.close(fd)
+    model.eval()
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            temp_path,
+            input_names=names,
+            output_names=['start_logits', 'end_logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        fd, quantized_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        os.close(fd)
+        quantize_dynamic(temp_path, quantized_path, weight_type=QuantType.QInt8)
+        os.remove(temp_path)
+        temp_path = quantized_path
+    os.replace(temp_path, path)
+    return path
+
+
+def load_qa_runtime(model_path, tokenizer, runtime='torch', cache_dir=None, revision='model', threads=None):
+    """
+    Load the QA model from `model_path` for the selected runtime.
+
+    Args:
+        model_path (str): Directory of the transformers checkpoint
+        tokenizer: The model's (fast) tokenizer
+        runtime (str): One of QA_RUNTIMES
+        cache_dir (str): Where exported ONNX graphs are kept
+        revision (str): Model fingerprint, so a changed model is re-exported
+        threads (int): CPU threads for inference (default: the library's choice)
+
+    Returns:
+        Callable with the question-answering pipeline's interface
+    """
+    if runtime not in QA_RUNTIMES:
+        raise ValueError(f"Unknown QA runtime '{runtime}', expected one of {', '.join(QA_RUNTIMES)}")
+
+    from transformers import AutoModelForQuestionAnswering
+
+    if runtime in ('torch', 'quantized'):
+        from transformers import pipeline
+
+        if threads:
+            configure_torch_threads(threads)
+        model = AutoModelForQuestionAnswering.from_pretrained(model_path, local_files_only=True)
+        if runtime == 'quantized':
+            model = quantize_model(model)
+        return pipeline("question-answering", model=model, tokenizer=tokenizer, device=-1)
+
+    suffix = '.int8.onnx' if runtime == 'onnx-int8' else '.onnx'
+    path = os.path.join(cache_dir or os.path.join(model_path, 'onnx'), f"qa-{revision[:16]}{suffix}")
+    if not os.path.exists(path):
+        # The PyTorch weights are only needed to export; the graph is reused afterwards
+        model = AutoModelForQuestionAnswering.from_pretrained(model_path, local_files_only=True)
+        export_onnx(model, tokenizer, path, quantize=runtime == 'onnx-int8')
+        del model
+    return EncodedQAPipeline(tokenizer, OnnxQAModel(path, threads))
+
+
+def _answer_tokens(answer):
+    return answer.lower().split()
+
+
+def compare_answers(expected, actual):
+    """
+    Compare two runs' answers to the same inputs.
+
+    Returns:
+        dict: 'pairs', 'exact_match' (share of identical answers), 'token_f1'
+              (mean word-overlap F1 of the answers), 'mean_score_diff' and
+              'max_score_diff' (absolute differences in answer confidence)
+    """
+    exact, f1_total, score_diffs = 0, 0.0, []
+    for want, got in zip(expected, actual):
+        exact += want['answer'].strip() == got['answer'].strip()
+        want_tokens, got_tokens = _answer_tokens(want['answer']), _answer_tokens(got['answer'])
+        common = sum(min(want_tokens.count(token), got_tokens.count(token)) for token in set(want_tokens))
+        if want_tokens and got_tokens and common:
+            precision, recall = common / len(got_tokens), common / len(want_tokens)
+            f1_total += 2 * precision * recall / (precision + recall)
+        elif not want_tokens and not got_tokens:
+            f1_total += 1.0
+        score_diffs.append(abs(want['score'] - got['score']))
+
+    count = len(score_diffs)
+    return {
+        'pairs': count,
+        'exact_match': exact / count if count else 1.0,
+        'token_f1': f1_total / count if count else 1.0,
+        'mean_score_diff': sum(score_diffs) / count if count else 0.0,
+        'max_score_diff': max(score_diffs, default=0.0)
+    }
+
+
+def parity_check(reference, candidate, pairs):
+    """
+    Run the same (question, context) pairs through the full-precision
+    pipeline and the runtime under test and compare their answers (see
+    `compare_answers`).
+    """
+    results = []
+    for qa_pipeline in (reference, candidate):
+        answers = qa_pipeline(question=[q for q, _ in pairs], context=[c for _, c in pairs])
+        results.append([answers] if isinstance(answers, dict) else answers)
+    return compare_answers(*results)
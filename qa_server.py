@@ -0,0 +1,191 @@
+import base64
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from concurrency import CapacityExceeded
+from qa_engine import TextEncoding
+
+_LENGTH = struct.Struct('>I')
+
+
+def send_message(sock, message):
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("QA inference connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+def _encode_encodings(encodings):
+    if encodings is None:
+        return None
+    return [[base64.b64encode(part).decode('ascii') for part in encoding.to_bytes()] for encoding in encodings]
+
+
+def _decode_encodings(encoded):
+    if encoded is None:
+        return None
+    return tuple(TextEncoding.from_bytes(*(base64.b64decode(part) for part in encoding)) for encoding in encoded)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher = self.server.batcher
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            if message.get('op') == 'stats':
+                send_message(self.request, {'stats': batcher.stats()})
+                continue
+            try:
+                future = batcher.submit(
+                    message['question'], message['context'], _decode_encodings(message.get('encodings')),
+                    block=message.get('block', False)
+                )
+                result = future.result()
+                reply = {'result': {
+                    'score': float(result['score']),
+                    'answer': result['answer'],
+                    'start': int(result.get('start', 0)),
+                    'end': int(result.get('end', 0))
+                }}
+            except CapacityExceeded as e:
+                reply = {'error': str(e), 'capacity': True, 'retry_after': e.retry_after, 'status': e.status}
+            except Exception as e:
+                reply = {'error': str(e)}
+            send_message(self.request, reply)
+
+
+class QAInferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves a QABatcher to the web workers of this host over a Unix socket.
+
+    The model is loaded once, in this process, instead of once per web worker.
+    Pairs from every worker meet in the same batcher, so they are batched
+    together and share its concurrency limit and queue bound. Each connection
+    carries one request at a time: a length-prefixed JSON message with the
+    question, context, optional precomputed encodings and `block` flag.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, batcher):
+        self.batcher = batcher
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)  # Only this user's web workers may connect
+
+
+class RemoteQABatcher:
+    """
+    Client side of QAInferenceServer with QABatcher's interface, so the app
+    uses it in place of a local batcher. Requests are sent from a small
+    thread pool, each thread keeping its own connection to the server.
+    """
+
+    def __init__(self, path, max_connections=16, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self.max_connections = max(1, int(max_connections))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use, so forking web workers doesn't copy running threads
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='qa-client')
+        return self._executor
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def _request(self, message):
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_message(sock, message)
+                return recv_message(sock)
+            except OSError as e:
+                sock, self._local.sock = getattr(self._local, 'sock', None), None
+                if sock is not None:
+                    sock.close()
+                # A broken connection (the server restarted) is retried once; a timeout isn't
+                if attempt or isinstance(e, socket.timeout):
+                    raise
+
+    def _call(self, message):
+        reply = self._request(message)
+        if 'error' in reply:
+            if reply.get('capacity'):
+                raise CapacityExceeded(reply['error'], reply.get('retry_after', 1), status=reply.get('status', 429))
+            raise RuntimeError(reply['error'])
+        return reply['result']
+
+    def submit(self, question, context, encodings=None, block=False):
+        with self._pending_lock:
+            self._pending += 1
+        future = self._get_executor().submit(self._call, {
+            'question': question,
+            'context': context,
+            'encodings': _encode_encodings(encodings),
+            'block': block
+        })
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        # Also runs for cancelled requests, which never reach the server
+        with self._pending_lock:
+            self._pending -= 1
+
+    @property
+    def queue_depth(self):
+        """Pairs this process has sent or is about to send and not had answered yet."""
+        return self._pending
+
+    def answer(self, question, context, timeout=None):
+        return self.submit(question, context).result(timeout=timeout)
+
+    def answer_many(self, pairs, timeout=None):
+        futures = [self.submit(question, context) for question, context in pairs]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def stats(self):
+        try:
+            stats = self._get_executor().submit(self._request, {'op': 'stats'}).result(timeout=self.timeout)['stats']
+        except Exception as e:
+            stats = {'error': str(e)}
+        return {'server': self.path, 'pending': self._pending, **stats}
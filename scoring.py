@@ -0,0 +1,117 @@
+import re
+import string
+
+import numpy as np
+
+# Weights of the provisional 0-10 score. It ranks answers for review and
+# pre-fills the admin's score; it isn't meant to replace the admin's grade.
+SCORE_WEIGHTS = {
+    'model_answer_recall': 0.4,  # How much of the QA model's extracted answer the candidate covered
+    'context_f1': 0.2,           # Word overlap with the reference answer in the question's context
+    'similarity': 0.4            # Cosine similarity of mean token embeddings of answer and context
+}
+
+_ARTICLES = re.compile(r'\b(a|an|the)\b')
+_PUNCTUATION = str.maketrans('', '', string.punctuation)
+
+
+def normalize_tokens(text):
+    """Lower-case words without punctuation and articles, as in SQuAD evaluation."""
+    text = (text or "").lower().translate(_PUNCTUATION)
+    return _ARTICLES.sub(' ', text).split()
+
+
+def bag_of_words(token_lists, vocabulary):
+    """
+    Count matrix of shape (len(token_lists), len(vocabulary)); words missing
+    from the vocabulary are added to it.
+    """
+    rows, columns = [], []
+    for row, tokens in enumerate(token_lists):
+        for token in tokens:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(token, len(vocabulary)))
+    return np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)
+
+
+def overlap_scores(candidates, references):
+    """
+    Word-overlap precision, recall and F1 of each candidate text against the
+    reference text at the same position, computed for all pairs at once.
+
+    Returns:
+        tuple: (precision, recall, f1) float arrays
+    """
+    candidate_tokens = [normalize_tokens(text) for text in candidates]
+    reference_tokens = [normalize_tokens(text) for text in references]
+    vocabulary = {}
+    candidate_index = bag_of_words(candidate_tokens, vocabulary)
+    reference_index = bag_of_words(reference_tokens, vocabulary)
+
+    shape = (len(candidates), max(1, len(vocabulary)))
+    candidate_counts = np.zeros(shape, dtype=np.float32)
+    reference_counts = np.zeros(shape, dtype=np.float32)
+    np.add.at(candidate_counts, candidate_index, 1)
+    np.add.at(reference_counts, reference_index, 1)
+
+    overlap = np.minimum(candidate_counts, reference_counts).sum(axis=1)
+    candidate_lengths = candidate_counts.sum(axis=1)
+    reference_lengths = reference_counts.sum(axis=1)
+    precision = np.divide(overlap, candidate_lengths, out=np.zeros_like(overlap), where=candidate_lengths > 0)
+    recall = np.divide(overlap, reference_lengths, out=np.zeros_like(overlap), where=reference_lengths > 0)
+    total = precision + recall
+    f1 = np.divide(2 * precision * recall, total, out=np.zeros_like(total), where=total > 0)
+    return precision, recall, f1
+
+
+def mean_embeddings(token_id_lists, embedding_matrix):
+    """
+    L2-normalized mean of each text's token embeddings (zero vector for empty texts).
+
+    Args:
+        token_id_lists (list): Arrays of token ids, one per text
+        embedding_matrix (np.ndarray): (vocab size, dim) input embeddings of the model
+    """
+    lengths = np.asarray([len(ids) for ids in token_id_lists], dtype=np.int64)
+    vectors = np.zeros((len(token_id_lists), embedding_matrix.shape[1]), dtype=np.float32)
+    non_empty = lengths > 0
+    if non_empty.any():
+        flat = np.concatenate([np.asarray(ids, dtype=np.int64) for ids in token_id_lists])
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])[non_empty]
+        sums = np.add.reduceat(embedding_matrix[flat].astype(np.float32), starts, axis=0)
+        vectors[non_empty] = sums / lengths[non_empty, None]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def provisional_scores(answers, model_answers, contexts, answer_ids=None, context_ids=None, embedding_matrix=None):
+    """
+    Score candidate answers against the QA model's answers and the reference contexts.
+
+    Args:
+        answers (list): The candidates' transcribed answers
+        model_answers (list): The QA model's extracted answers to the same questions
+        contexts (list): The questions' reference contexts
+        answer_ids, context_ids (list): Token ids of answers and contexts, for the similarity term
+        embedding_matrix (np.ndarray): Model input embeddings; without it, similarity is left out
+
+    Returns:
+        dict: Arrays 'model_answer_recall', 'context_f1', 'similarity' (NaN when
+              not computed) and 'score' (0-10, rounded to one decimal)
+    """
+    _, model_answer_recall, _ = overlap_scores(answers, model_answers)
+    _, _, context_f1 = overlap_scores(answers, contexts)
+    components = {'model_answer_recall': model_answer_recall, 'context_f1': context_f1}
+
+    if embedding_matrix is not None and answer_ids is not None and context_ids is not None:
+        similarity = np.sum(
+            mean_embeddings(answer_ids, embedding_matrix) * mean_embeddings(context_ids, embedding_matrix), axis=1
+        )
+        components['similarity'] = np.clip(similarity, 0.0, 1.0)
+
+    weight_total = sum(SCORE_WEIGHTS[name] for name in components)
+    combined = sum(SCORE_WEIGHTS[name] * values for name, values in components.items()) / weight_total
+    result = dict(components)
+    result.setdefault('similarity', np.full(len(answers), np.nan, dtype=np.float32))
+    result['score'] = np.round(10.0 * combined, 1)
+    return result
@@ -0,0 +1,51 @@
+"""
+Cooperative serving mode for I/O-bound load.
+
+Patches the standard library with gevent before the app is imported, so
+each request runs in a greenlet and every blocking network call (OpenAI
+completions and Whisper through httpx, gTTS, the background job pools)
+yields to other requests while it waits. One process can then hold
+hundreds of candidates waiting on the LLM instead of one OS thread each.
+Outbound calls stay bounded by the `OPENAI_MAX_CONCURRENCY` and
+`TTS_MAX_CONCURRENCY` limiters; callers that can't get a slot within the
+queue timeout get a 503 with Retry-After.
+
+CPU-bound work (QA forward passes, local Whisper) still runs on the
+process's single hub thread, so keep QA-heavy admin traffic on threaded
+workers if it becomes a bottleneck.
+
+Needs gevent (pinned in requirements.txt). Usage:
+    python serve.py [--host 0.0.0.0] [--port 5000]
+    gunicorn -k gevent --worker-connections 500 app:app   # the same mode under gunicorn
+"""
+from gevent import monkey
+
+# `select` stays unpatched: gevent removes select.epoll, which breaks libraries
+# that probe for it on import (trio, which httpcore imports when installed).
+# Nothing on the request path blocks in select; sockets are patched.
+monkey.patch_all(select=False)
+
+import argparse
+
+from gevent.pywsgi import WSGIServer
+
+from app import app, create_default_admin, fail_stale_transcription_jobs, upgrade_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        upgrade_schema()
+        create_default_admin()
+        fail_stale_transcription_jobs()
+
+    print(f"Serving on http://{args.host}:{args.port} (gevent)")
+    WSGIServer((args.host, args.port), app).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
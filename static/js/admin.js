@@ -6,6 +6,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const sendQuestionBtn = document.getElementById('sendQuestion');
     const candidateModal = new bootstrap.Modal(document.getElementById('candidateModal'));
 
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
     // Ensure elements are found before adding event listeners
     if (generateQuestionsBtn) {
         generateQuestionsBtn.addEventListener('click', async function() {
@@ -115,7 +121,16 @@ document.addEventListener('DOMContentLoaded', function() {
                             <h6>${q.question}</h6>
                             <p class="mb-1">Answer: ${q.answer}</p>
                             <p class="mb-1">Score: ${q.score}</p>
-                            <p class="mb-0">Feedback: ${q.feedback}</p>
+                            ${q.feedback ? `
+                            <p class="mb-1">Grammar: ${escapeHtml(q.feedback.grammar)}</p>
+                            <p class="mb-1">Fluency: ${escapeHtml(q.feedback.fluency)}</p>
+                            <p class="mb-1 feedback-suggestions">Suggestions: ${escapeHtml(q.feedback.suggestions)}</p>` : ''}
+                            ${q.admin_feedback ? `<p class="mb-0">Admin feedback: ${escapeHtml(q.admin_feedback)}</p>` : ''}
+                            ${q.audio_url ? `
+                            <audio controls preload="none" class="w-100 mt-2">
+                                <source src="${q.audio_url}">
+                                Your browser does not support the audio element.
+                            </audio>` : ''}
                         </div>
                     `;
                     });
@@ -47,12 +47,23 @@ document.addEventListener('DOMContentLoaded', function() {
                 mediaRecorder = new MediaRecorder(stream, {
                     mimeType: supportedMimeType
                 });
+                audioChunks = [];
+
+                // Upload timeslices while recording so the server can transcribe as the candidate speaks
+                const answerStream = await startAnswerStream(supportedMimeType);
                 
                 mediaRecorder.ondataavailable = (event) => {
                     audioChunks.push(event.data);
+                    if (answerStream) {
+                        answerStream.send(event.data);
+                    }
                 };
 
                 mediaRecorder.onstop = async () => {
+                    if (answerStream && await answerStream.finish()) {
+                        return;
+                    }
+
                     // Create audio blob
                     const audioBlob = new Blob(audioChunks, { type: supportedMimeType });
                     
@@ -66,7 +77,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     await submitRecording(wavBlob);
                 };
 
-                mediaRecorder.start();
+                mediaRecorder.start(answerStream ? 1000 : undefined);
                 isRecording = true;
                 recordButton.innerHTML = '<i class="fas fa-stop"></i> Stop Recording';
                 recordButton.classList.remove('btn-primary');
@@ -135,14 +146,91 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    function getQuestionId() {
+        // Get the question_id from the URL
+        const urlParams = new URLSearchParams(window.location.search);
+        return urlParams.get('question_id') || window.location.pathname.split('/').pop();
+    }
+
+    // Open an incremental transcription stream; returns null if the server can't provide one
+    async function startAnswerStream(mimeType) {
+        const questionId = getQuestionId();
+        let streamId;
+        try {
+            const response = await fetch('/api/answer-stream', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ question_id: questionId, mimetype: mimeType })
+            });
+            const data = await response.json();
+            if (data.status !== 'success') return null;
+            streamId = data.stream_id;
+        } catch (err) {
+            console.error('Error starting answer stream:', err);
+            return null;
+        }
+
+        let seq = 0;
+        let failed = false;
+        let uploads = Promise.resolve();
+
+        return {
+            // Chunks are sent one after another so the server receives them in order
+            send(chunk) {
+                const chunkSeq = seq++;
+                uploads = uploads.then(async () => {
+                    if (failed) return;
+                    const formData = new FormData();
+                    formData.append('audio', chunk);
+                    formData.append('seq', chunkSeq);
+                    try {
+                        const response = await fetch(`/api/answer-stream/${streamId}/chunk`, {
+                            method: 'POST',
+                            body: formData
+                        });
+                        const data = await response.json();
+                        if (data.status !== 'success') {
+                            failed = true;
+                        } else if (data.partial_transcript) {
+                            transcriptBox.textContent = data.partial_transcript + ' …';
+                        }
+                    } catch (err) {
+                        console.error('Error uploading answer chunk:', err);
+                        failed = true;
+                    }
+                });
+            },
+
+            // Returns false if the caller should fall back to uploading the whole recording
+            async finish() {
+                await uploads;
+                if (failed) return false;
+
+                transcriptBox.textContent = 'Processing your recording...';
+                feedbackBox.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"></div><p class="mt-2">Generating feedback...</p></div>';
+                try {
+                    // The server sends the transcript, then generates and streams the feedback in the same request
+                    const response = await fetch(`/api/answer-stream/${streamId}/finish`, {
+                        method: 'POST'
+                    });
+                    if (!response.ok) return false;
+                    return await streamFeedback(questionId, null, response);
+                } catch (err) {
+                    console.error('Error finishing answer stream:', err);
+                    return false;
+                }
+            }
+        };
+    }
+
     // Function to submit recording to server
     async function submitRecording(audioBlob) {
         const formData = new FormData();
         formData.append('audio', audioBlob);
         
-        // Get the question_id from the URL
-        const urlParams = new URLSearchParams(window.location.search);
-        const questionId = urlParams.get('question_id') || window.location.pathname.split('/').pop();
+        const questionId = getQuestionId();
         formData.append('question_id', questionId);
         
         try {
@@ -150,51 +238,173 @@ document.addEventListener('DOMContentLoaded', function() {
             transcriptBox.textContent = 'Processing your recording...';
             feedbackBox.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"></div><p class="mt-2">Generating feedback...</p></div>';
             
-            const response = await fetch('/api/record-answer', {
+            // Transcription and feedback are produced by a single server-side job
+            const response = await fetch('/api/record-and-evaluate', {
                 method: 'POST',
                 body: formData
             });
             
-            const data = await response.json();
+            const data = await waitForTranscript(await response.json());
             if (data.status === 'success' && data.transcript) {
                 // Update transcript
                 transcriptBox.textContent = data.transcript || 'No transcript available';
                 
-                // Get feedback
-                const feedbackResponse = await fetch('/api/submit-feedback', {
+                if (data.feedback) {
+                    renderFeedback(data.score, data.feedback);
+                } else {
+                    // Get feedback, streamed section by section as the model writes it
+                    await streamFeedback(questionId, data.transcript);
+                }
+            } else {
+                transcriptBox.textContent = 'Error processing your recording. Please try again.';
+                feedbackBox.innerHTML = '<div class="alert alert-danger">Feedback unavailable due to an error.</div>';
+            }
+        } catch (err) {
+            console.error('Error submitting recording:', err);
+            transcriptBox.textContent = 'Error processing your recording. Please try again.';
+            feedbackBox.innerHTML = '<div class="alert alert-danger">Feedback unavailable due to an error.</div>';
+        }
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    // Feedback arrives as {grammar, fluency, suggestions}; any section may still be missing while streaming
+    function renderFeedback(score, feedback) {
+        feedbackBox.innerHTML = `
+            <div class="mb-3">
+                <strong>Score:</strong> ${score || 'N/A'}/10
+            </div>
+            ${feedback.grammar ? `<p><strong>Grammar:</strong> ${escapeHtml(feedback.grammar)}</p>` : ''}
+            ${feedback.fluency ? `<p><strong>Fluency:</strong> ${escapeHtml(feedback.fluency)}</p>` : ''}
+            ${feedback.suggestions ? `<p><strong>Suggestions for improvement:</strong></p><p class="feedback-suggestions">${escapeHtml(feedback.suggestions)}</p>` : ''}
+        `;
+    }
+
+    // Request feedback as a server-sent event stream, rendering each section as it arrives.
+    // `response` is an event stream already opened by the caller, which may start with the transcript.
+    // Returns false only if no transcript was received to fall back with.
+    async function streamFeedback(questionId, transcript, response) {
+        const sections = {};
+        let finished = false;
+
+        try {
+            if (!response) {
+                response = await fetch('/api/submit-feedback/stream', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
                     },
                     body: JSON.stringify({ 
                         question_id: questionId,
-                        transcript: data.transcript 
+                        transcript: transcript 
                     })
                 });
-                
-                const feedbackData = await feedbackResponse.json();
-                if (feedbackData.status === 'success') {
-                    // Format the feedback with proper HTML
-                    const score = feedbackData.score || 'N/A';
-                    
-                    feedbackBox.innerHTML = `
-                        <div class="mb-3">
-                            <strong>Score:</strong> ${score}/10
-                        </div>
-                        ${feedbackData.feedback}
-                    `;
-                } else {
-                    feedbackBox.innerHTML = '<div class="alert alert-warning">Feedback will be available shortly...</div>';
+            }
+            if (!response.ok || !response.body) {
+                throw new Error(`Feedback stream failed with status ${response.status}`);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                // Events are separated by a blank line
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const rawEvent = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    const eventName = (rawEvent.match(/^event: (.*)$/m) || [])[1];
+                    const dataLine = (rawEvent.match(/^data: (.*)$/m) || [])[1];
+                    if (!eventName || !dataLine) continue;
+                    const eventData = JSON.parse(dataLine);
+
+                    if (eventName === 'transcript') {
+                        transcript = eventData.text;
+                        transcriptBox.textContent = transcript;
+                    } else if (eventName === 'section') {
+                        sections[eventData.name] = eventData.value;
+                        renderFeedback(sections.score, sections);
+                    } else if (eventName === 'done') {
+                        renderFeedback(eventData.score, eventData.feedback);
+                        finished = true;
+                    }
                 }
-            } else {
-                transcriptBox.textContent = 'Error processing your recording. Please try again.';
-                feedbackBox.innerHTML = '<div class="alert alert-danger">Feedback unavailable due to an error.</div>';
             }
         } catch (err) {
-            console.error('Error submitting recording:', err);
-            transcriptBox.textContent = 'Error processing your recording. Please try again.';
-            feedbackBox.innerHTML = '<div class="alert alert-danger">Feedback unavailable due to an error.</div>';
+            console.error('Error streaming feedback:', err);
+        }
+
+        if (!finished) {
+            if (!transcript) return false;
+
+            // Fall back to the non-streaming endpoint, waiting out Retry-After while the server is busy
+            let feedbackResponse;
+            for (let attempt = 0; attempt < 4; attempt++) {
+                feedbackResponse = await fetch('/api/submit-feedback', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({ 
+                        question_id: questionId,
+                        transcript: transcript 
+                    })
+                });
+                if (feedbackResponse.status !== 503 && feedbackResponse.status !== 429) break;
+                const retryAfter = parseInt(feedbackResponse.headers.get('Retry-After'), 10) || 2;
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+            }
+            
+            const feedbackData = await feedbackResponse.json();
+            if (feedbackData.status === 'success') {
+                renderFeedback(feedbackData.score, feedbackData.feedback);
+            } else {
+                feedbackBox.innerHTML = '<div class="alert alert-warning">Feedback will be available shortly...</div>';
+            }
+        }
+        return true;
+    }
+
+    // Poll the transcription job until the background worker has finished with it
+    async function waitForTranscript(uploadData) {
+        if (uploadData.status !== 'success' || !uploadData.job_id) {
+            return uploadData;
+        }
+
+        // Give up eventually; a job lost to a server restart is only marked failed once it times out
+        const deadline = Date.now() + 5 * 60 * 1000;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, 500));
+
+            const response = await fetch(`/api/transcription-job/${uploadData.job_id}`);
+            const data = await response.json();
+            if (data.status !== 'success') {
+                return data;
+            }
+
+            if (data.job.status === 'Completed') {
+                return {
+                    status: 'success',
+                    transcript: data.job.transcript,
+                    score: data.job.score,
+                    feedback: data.job.feedback
+                };
+            }
+            if (data.job.status === 'Failed') {
+                return { status: 'error', message: data.job.error };
+            }
         }
+        return { status: 'error', message: 'Timed out waiting for the transcription' };
     }
 
     function stopRecording() {
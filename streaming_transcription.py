@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+import uuid
+from io import BytesIO
+
+from metrics import timed_stage
+from transcription import SAMPLE_RATE, decode_audio, encode_wav, find_speech_segments
+
+
+class TranscriptionStream:
+    """
+    One answer being uploaded in MediaRecorder timeslices while the candidate speaks.
+
+    Chunks are appended to a file as they arrive. Each processing pass decodes
+    the audio received so far, finds speech segments (merged up to
+    `chunk_seconds`) in the part not yet transcribed, and transcribes every
+    segment that already ends at a pause.
+    The segment still being spoken is left for a later pass. Finished segment
+    transcripts are stitched together in order, so stopping only leaves the
+    last few seconds to transcribe.
+    """
+
+    def __init__(self, stream_id, question_id, path, backend, extension='.webm',
+                 guard_seconds=0.5, min_pending_seconds=1.0, chunk_seconds=5.0):
+        self.id = stream_id
+        self.question_id = question_id
+        self.path = path
+        self.backend = backend
+        self.extension = extension
+        self.guard_samples = int(guard_seconds * SAMPLE_RATE)
+        self.min_pending_samples = int(min_pending_seconds * SAMPLE_RATE)
+        self.chunk_seconds = chunk_seconds
+        self.next_seq = 0
+        self.committed_samples = 0
+        self.segments = []
+        self.updated_at = time.monotonic()
+        self.scheduled = False
+        self._append_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+
+    def append(self, seq, data):
+        with self._append_lock:
+            if seq != self.next_seq:
+                raise ValueError(f"Expected chunk {self.next_seq}, got {seq}")
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self.next_seq += 1
+            self.updated_at = time.monotonic()
+
+    def read_audio(self):
+        with self._append_lock:
+            if not os.path.exists(self.path):
+                return b''
+            with open(self.path, 'rb') as f:
+                return f.read()
+
+    @property
+    def transcript(self):
+        return " ".join(text for text in self.segments if text)
+
+    def process(self, final=False):
+        """
+        Transcribe newly completed segments; with `final`, transcribe everything left.
+
+        Returns:
+            str: The transcript stitched together so far
+        """
+        with self._process_lock:
+            audio = self.read_audio()
+            if not audio:
+                return self.transcript
+
+            pending = decode_audio(audio)[self.committed_samples:]
+            if not final and len(pending) < self.min_pending_samples + self.guard_samples:
+                return self.transcript
+
+            # Shorter chunks than a whole-file transcription, so segments can be committed while recording
+            segments = find_speech_segments(pending, max_chunk_seconds=self.chunk_seconds)
+            if not final:
+                # The last segment runs to the end of what we have, so the candidate may still be mid-sentence
+                segments = [(start, end) for start, end in segments if end <= len(pending) - self.guard_samples]
+
+            for start, end in segments:
+                with timed_stage('transcription'):
+                    text = self.backend.transcribe(BytesIO(encode_wav(pending[start:end])), filename='segment.wav')
+                self.segments.append((text or "").strip())
+
+            if final:
+                self.committed_samples += len(pending)
+            elif segments:
+                self.committed_samples += segments[-1][1]
+            return self.transcript
+
+
+class TranscriptionStreamManager:
+    """
+    Tracks the open transcription streams of this process.
+
+    Streams live in memory, so with several server processes the chunk and
+    finish requests of one answer must reach the process that started it
+    (sticky sessions). Abandoned streams are dropped after `ttl_seconds`.
+    """
+
+    def __init__(self, root, backend, submit, ttl_seconds=3600):
+        self.root = os.path.abspath(root)
+        self.backend = backend
+        self.submit = submit
+        self.ttl_seconds = ttl_seconds
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def start(self, question_id, extension='.webm'):
+        self.expire()
+        os.makedirs(self.root, exist_ok=True)
+        stream_id = str(uuid.uuid4())
+        stream = TranscriptionStream(
+            stream_id, question_id, os.path.join(self.root, stream_id + extension), self.backend, extension
+        )
+        with self._lock:
+            self._streams[stream_id] = stream
+        return stream
+
+    def get(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def add_chunk(self, stream, seq, data):
+        stream.append(seq, data)
+
+        # At most one pass queued per stream; a pass picks up every chunk received before it runs
+        with self._lock:
+            if stream.scheduled:
+                return
+            stream.scheduled = True
+        self.submit(self._process, stream)
+
+    def _process(self, stream):
+        with self._lock:
+            stream.scheduled = False
+        stream.process()
+
+    def finish(self, stream):
+        """
+        Transcribe whatever is left and close the stream.
+
+        Returns:
+            tuple: (transcript, complete recording bytes)
+        """
+        try:
+            transcript = stream.process(final=True)
+            return transcript, stream.read_audio()
+        finally:
+            self.discard(stream)
+
+    def discard(self, stream):
+        with self._lock:
+            self._streams.pop(stream.id, None)
+        if os.path.exists(stream.path):
+            os.remove(stream.path)
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        with self._lock:
+            stale = [stream for stream in self._streams.values() if stream.updated_at < cutoff]
+        for stream in stale:
+            self.discard(stream)
@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+import wave
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TranscriptionBackend:
+    """Converts a recorded answer to text."""
+
+    name = 'base'
+
+    def transcribe(self, audio_file, filename='answer.webm'):
+        """
+        Args:
+            audio_file: Binary file-like object positioned at the start of the audio
+            filename (str): Name used to tell the backend the container format
+
+        Returns:
+            str: The transcript (may be empty if nothing was recognised)
+        """
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    name = 'openai'
+
+    def __init__(self, provider, model='whisper-1'):
+        self.provider = provider
+        self.model = model
+
+    def transcribe(self, audio_file, filename='answer.webm'):
+        # Send the file to OpenAI Whisper with improved parameters, reusing pooled connections
+        return self.provider.timed(
+            'whisper',
+            self.provider.openai_client().audio.transcriptions.create,
+            stage='whisper',
+            model=self.model,
+            file=(filename, audio_file),
+            response_format="text",
+            language="en",
+            temperature=0.2,
+            prompt="This is an interview answer. Please transcribe it accurately."
+        )
+
+
+class FakeTranscriptionBackend(TranscriptionBackend):
+    """
+    Offline stand-in for tests and load runs: returns a fixed transcript after
+    an optional simulated latency, without calling any remote service.
+    """
+
+    name = 'fake'
+
+    def __init__(self, transcript=None, latency_ms=0):
+        self.transcript = transcript
+        self.latency_ms = float(latency_ms)
+
+    def transcribe(self, audio_file, filename='answer.webm'):
+        size = len(audio_file.read())
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return self.transcript or f"This is a fake transcript of a {size} byte recording."
+
+
+SAMPLE_RATE = 16000  # Whisper models expect 16 kHz mono
+
+
+def decode_audio(data, sample_rate=SAMPLE_RATE):
+    """
+    Decode a recording to mono float32 samples in [-1, 1] at `sample_rate`.
+
+    WAV (what candidate.js uploads) is decoded in-process; anything else
+    (webm/opus, ogg, mp3) is piped through ffmpeg, which must be installed.
+    """
+    import numpy as np
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        with wave.open(BytesIO(data)) as wav:
+            channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        if width != 2:
+            raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+        # A recording still being uploaded may end part-way through a frame
+        frames = frames[:len(frames) - len(frames) % (width * channels)]
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != sample_rate and len(samples):
+            # Linear resampling is plenty for speech recognition
+            duration = len(samples) / rate
+            target = np.linspace(0, duration, int(duration * sample_rate), endpoint=False)
+            samples = np.interp(target, np.arange(len(samples)) / rate, samples).astype(np.float32)
+        return samples
+
+    from transformers.pipelines.audio_utils import ffmpeg_read
+    return ffmpeg_read(data, sample_rate)
+
+
+def find_speech_segments(samples, sample_rate=SAMPLE_RATE, frame_ms=30, min_silence_ms=300,
+                         max_chunk_seconds=25.0, energy_ratio=0.1):
+    """
+    Energy-based voice activity detection: find where to cut the recording at pauses.
+
+    Frames whose RMS energy is below `energy_ratio` of the loud (95th
+    percentile) level count as silence. The audio is cut in the middle of
+    every pause of at least `min_silence_ms`. Neighbouring speech segments are
+    then merged back together up to `max_chunk_seconds` (inside Whisper's
+    30 second window), and all-silent segments are dropped.
+
+    Returns:
+        list: (start, end) sample offsets, in order
+    """
+    import numpy as np
+
+    frame = int(sample_rate * frame_ms / 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return [(0, len(samples))] if len(samples) else []
+
+    energy = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    threshold = max(np.percentile(energy, 95) * energy_ratio, 1e-4)
+    voiced = energy > threshold
+    if not voiced.any():
+        return []
+
+    # Cut points in the middle of each long-enough run of silent frames
+    min_silent_frames = max(1, min_silence_ms // frame_ms)
+    cuts, run_start = [0], None
+    for i, is_voiced in enumerate(voiced):
+        if not is_voiced and run_start is None:
+            run_start = i
+        elif is_voiced and run_start is not None:
+            if i - run_start >= min_silent_frames:
+                cuts.append((run_start + i) // 2 * frame)
+            run_start = None
+    cuts.append(len(samples))
+
+    # Merge segments greedily up to the maximum chunk length
+    max_samples = int(max_chunk_seconds * sample_rate)
+    chunks, start = [], cuts[0]
+    for previous, cut in zip(cuts[1:-1], cuts[2:]):
+        if cut - start > max_samples:
+            chunks.append((start, previous))
+            start = previous
+    chunks.append((start, cuts[-1]))
+
+    segments = []
+    for start, end in chunks:
+        # Segments longer than the window (no pauses at all) are split evenly
+        for piece_start in range(start, end, max_samples):
+            piece_end = min(end, piece_start + max_samples)
+            if voiced[piece_start // frame:max(piece_start // frame + 1, piece_end // frame)].any():
+                segments.append((piece_start, piece_end))
+    return segments
+
+
+def split_on_silence(samples, sample_rate=SAMPLE_RATE, **kwargs):
+    """
+    Cut a recording into speech chunks at pauses (see `find_speech_segments`).
+
+    Returns:
+        list: Float32 sample arrays, in order
+    """
+    return [samples[start:end] for start, end in find_speech_segments(samples, sample_rate, **kwargs)]
+
+
+def encode_wav(samples, sample_rate=SAMPLE_RATE):
+    """Encode float32 samples as 16-bit mono WAV bytes, for backends that take files."""
+    import numpy as np
+
+    buffer = BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Offline speech-to-text on the CPU with a Whisper-class transformers model.
+
+    The recording is split into chunks at pauses, and the chunks are
+    transcribed in parallel across cores, so throughput isn't capped by remote
+    rate limits. With `quantize` the model's linear layers are dynamically
+    quantized to int8, which is typically 2-3x faster on CPU at a small cost
+    in accuracy.
+
+    torch's thread count is shared with the QA model, so it is set once for
+    the process (see concurrency.configure_torch_threads). Pass the same
+    `threads` the QA model uses; the chunk workers then default to the number
+    of such thread groups that fit on the cores.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_name='openai/whisper-base.en', quantize=True, workers=None, threads=None):
+        self.model_name = model_name
+        self.quantize = quantize
+        cores = os.cpu_count() or 2
+        self.workers = max(1, int(workers or max(1, cores // (int(threads) if threads else 2))))
+        self.threads = max(1, int(threads)) if threads else max(1, cores // self.workers)
+        self._pipeline = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def load(self):
+        if self._pipeline is None:
+            with self._lock:
+                if self._pipeline is None:
+                    import torch
+                    from transformers import pipeline
+
+                    from concurrency import configure_torch_threads
+
+                    configure_torch_threads(self.threads)
+                    asr = pipeline("automatic-speech-recognition", model=self.model_name, device=-1)
+                    if self.quantize:
+                        asr.model = torch.quantization.quantize_dynamic(
+                            asr.model, {torch.nn.Linear}, dtype=torch.qint8
+                        )
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='local-stt')
+                    self._pipeline = asr
+        return self._pipeline
+
+    def transcribe(self, audio_file, filename='answer.webm'):
+        asr = self.load()
+        chunks = split_on_silence(decode_audio(audio_file.read()))
+
+        # English-only checkpoints (*.en) reject a language argument
+        generate_kwargs = {} if self.model_name.endswith('.en') else {"language": "en", "task": "transcribe"}
+
+        def run(chunk):
+            return asr({"raw": chunk, "sampling_rate": SAMPLE_RATE}, generate_kwargs=generate_kwargs)["text"].strip()
+
+        return " ".join(text for text in self._executor.map(run, chunks) if text)
+
+
+def create_transcription_backend(name=None, provider=None, torch_threads=None):
+    """
+    Build the backend selected by `name` or the TRANSCRIPTION_BACKEND variable.
+
+    Args:
+        name (str): 'openai' (default), 'local' or 'fake'
+        provider (LLMProvider): Shared client provider used by the OpenAI backend
+        torch_threads (int): The process's torch thread count, shared with the QA model (local backend)
+
+    Returns:
+        TranscriptionBackend: The configured backend
+    """
+    name = (name or os.getenv('TRANSCRIPTION_BACKEND', 'openai')).lower()
+    if name == 'openai':
+        if provider is None:
+            from llm_provider import LLMProvider
+            provider = LLMProvider.from_env()
+        return OpenAIWhisperBackend(provider)
+    if name == 'local':
+        return LocalWhisperBackend(
+            model_name=os.getenv('LOCAL_WHISPER_MODEL', 'openai/whisper-base.en'),
+            quantize=os.getenv('LOCAL_WHISPER_QUANTIZE', '1') == '1',
+            workers=os.getenv('LOCAL_WHISPER_WORKERS'),
+            threads=torch_threads
+        )
+    if name == 'fake':
+        return FakeTranscriptionBackend(
+            transcript=os.getenv('FAKE_TRANSCRIPT'),
+            latency_ms=os.getenv('FAKE_TRANSCRIPTION_LATENCY_MS', 0)
+        )
+    raise ValueError(f"Unknown transcription backend '{name}'")
@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+from caching import CoalescingCache
+
+logger = logging.getLogger(__name__)
+
+class GTTSSynthesizer:
+    name = 'gtts'
+
+    def synthesize(self, text, lang='en'):
+        from gtts import gTTS
+
+        # Create gTTS object and save it to a BytesIO object
+        tts = gTTS(text=text, lang=lang, slow=False)
+        audio_file = BytesIO()
+        tts.write_to_fp(audio_file)
+        return audio_file.getvalue()
+
+
+class FakeSynthesizer:
+    """
+    Offline stand-in that returns silent MP3 audio, about a quarter of a second
+    per word, without calling Google's TTS service.
+    """
+
+    name = 'fake'
+
+    # One silent MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, 417 bytes, ~26 ms
+    SILENT_FRAME = b'\xff\xfb\x90\x00' + b'\x00' * 413
+
+    def synthesize(self, text, lang='en'):
+        frames = max(1, len(text.split())) * 10
+        return self.SILENT_FRAME * frames
+
+
+class TTSCache:
+    """
+    Two-tier cache of synthesized speech keyed by a hash of language and text.
+
+    Audio is kept in an in-memory LRU and persisted on disk at
+    `<root>/<key[:2]>/<key>.mp3`, so it survives restarts and is shared by
+    worker processes. Concurrent requests for the same missing text share one
+    synthesis call. With a `limiter`, calls to the synthesizer hold one of its
+    slots, bounding concurrent requests to the TTS service.
+
+    The disk tier holds at most `disk_entries` files. Reading a file refreshes
+    its modification time, and once the limit is passed the least recently
+    used files are removed, down to 90% of the limit.
+    """
+
+    def __init__(self, root, synthesizer, memory_entries=256, limiter=None, disk_entries=10000):
+        self.root = os.path.abspath(root)
+        self.synthesizer = synthesizer
+        self.limiter = limiter
+        self.memory = CoalescingCache(max_entries=memory_entries, ttl_seconds=float('inf'))
+        self.disk_entries = max(1, int(disk_entries))
+        self.synthesized = 0
+        self.evicted = 0
+        self._disk_count = None  # Counted on the first write; other processes' writes are picked up on eviction
+        self._disk_lock = threading.Lock()
+
+    @staticmethod
+    def key(text, lang='en'):
+        return hashlib.sha256(f"{lang}\n{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.mp3")
+
+    def get(self, text, lang='en'):
+        """
+        Return MP3 bytes for `text`, synthesizing and storing them on a miss.
+
+        Returns:
+            tuple: (key, audio bytes); the key doubles as a strong ETag
+        """
+        key = self.key(text, lang)
+        return key, self.memory.get_or_compute(key, lambda: self._load_or_synthesize(key, text, lang))
+
+    def _load_or_synthesize(self, key, text, lang):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path)  # Mark as recently used for eviction
+            return audio
+        except FileNotFoundError:
+            pass
+
+        if self.limiter is not None:
+            with self.limiter.slot():
+                audio = self.synthesizer.synthesize(text, lang)
+        else:
+            audio = self.synthesizer.synthesize(text, lang)
+        self.synthesized += 1
+
+        # Write atomically so another process never reads a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        with os.fdopen(fd, 'wb') as out:
+            out.write(audio)
+        os.replace(temp_path, path)
+        self._stored()
+        return audio
+
+    def _disk_files(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.mp3'):
+                    yield os.path.join(directory, name)
+
+    def _stored(self):
+        with self._disk_lock:
+            if self._disk_count is None:
+                self._disk_count = sum(1 for _ in self._disk_files())
+            else:
+                self._disk_count += 1
+            if self._disk_count > self.disk_entries:
+                self._evict()
+
+    def _evict(self):
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                pass  # Evicted by another process
+        files.sort()
+        excess = len(files) - int(self.disk_entries * 0.9)
+        for _, path in files[:max(0, excess)]:
+            try:
+                os.remove(path)
+                self.evicted += 1
+            except FileNotFoundError:
+                pass
+        self._disk_count = len(files) - max(0, excess)
+        logger.info("Evicted %d cached TTS file(s) from %s", max(0, excess), self.root)
+
+    def pregenerate(self, texts, lang='en'):
+        for text in texts:
+            if text and text.strip():
+                self.get(text, lang)
+
+
+def create_synthesizer(name=None):
+    """
+    Build the synthesizer selected by `name` or the TTS_BACKEND variable.
+
+    Args:
+        name (str): 'gtts' (default) or 'fake'
+    """
+    name = (name or os.getenv('TTS_BACKEND', 'gtts')).lower()
+    if name == 'gtts':
+        return GTTSSynthesizer()
+    if name == 'fake':
+        return FakeSynthesizer()
+    raise ValueError(f"Unknown TTS backend '{name}'")